@@ -0,0 +1,45 @@
+"""
+Benchmarks for custom generators with different numbers of fields.
+"""
+
+from .common import items_per_second, make_custom_generator_class
+
+
+class CustomGenerators:
+    params = ([5, 50, 200], ["rows", "columns"])
+    param_names = ["num_fields", "storage"]
+
+    num = 1_000
+
+    def setup(self, num_fields, storage):
+        self.g = make_custom_generator_class(num_fields)()
+
+    def time_generate(self, num_fields, storage):
+        self.g.generate(self.num, seed=12345, storage=storage)
+
+    def peakmem_generate(self, num_fields, storage):
+        self.g.generate(10 * self.num, seed=12345, storage=storage)
+
+    def track_items_per_second(self, num_fields, storage):
+        return items_per_second(lambda num: self.g.generate(num, storage=storage), self.num)
+
+    track_items_per_second.unit = "items/s"
+
+
+class CustomGeneratorColumns:
+    params = [5, 50, 200]
+    param_names = ["num_fields"]
+
+    num = 1_000
+
+    def setup(self, num_fields):
+        self.g = make_custom_generator_class(num_fields)()
+
+    def time_generate_columns(self, num_fields):
+        self.g.generate_columns(self.num, seed=12345)
+
+    def time_generate_as_df(self, num_fields):
+        self.g.generate_as_df(self.num, seed=12345)
+
+    def time_skip(self, num_fields):
+        self.g.skip(self.num)
@@ -0,0 +1,30 @@
+"""
+Benchmarks for chains of nested `Apply` generators.
+"""
+
+from .common import items_per_second, make_apply_chain
+
+
+class ApplyChains:
+    params = list(range(1, 11))
+    param_names = ["depth"]
+
+    num = 10_000
+
+    def setup(self, depth):
+        self.g = make_apply_chain(depth)
+        self.g.reset(seed=12345)
+
+    def time_generate_as_list(self, depth):
+        self.g.generate_as_list(num=self.num)
+
+    def time_generate_batch(self, depth):
+        self.g.generate_batch(self.num)
+
+    def peakmem_generate(self, depth):
+        self.g.generate_batch(10 * self.num)
+
+    def track_items_per_second(self, depth):
+        return items_per_second(lambda num: self.g.generate_as_list(num=num), self.num)
+
+    track_items_per_second.unit = "items/s"
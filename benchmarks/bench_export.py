@@ -0,0 +1,51 @@
+"""
+Benchmarks for exporting generated items (to dataframes and files).
+"""
+
+import os
+import tempfile
+
+from .common import items_per_second, make_custom_generator_class
+
+
+class ItemListToDataFrame:
+    params = ([5, 50], ["rows", "columns"])
+    param_names = ["num_fields", "storage"]
+
+    num = 10_000
+
+    def setup(self, num_fields, storage):
+        g = make_custom_generator_class(num_fields)()
+        self.item_list = g.generate(self.num, seed=12345, storage=storage)
+
+    def time_to_df(self, num_fields, storage):
+        self.item_list.to_df()
+
+    def peakmem_to_df(self, num_fields, storage):
+        self.item_list.to_df()
+
+    def track_items_per_second(self, num_fields, storage):
+        return items_per_second(lambda num: self.item_list.to_df(), self.num)
+
+    track_items_per_second.unit = "items/s"
+
+
+class GenerateToFile:
+    params = ["csv", "jsonl"]
+    param_names = ["format"]
+
+    num = 10_000
+
+    def setup(self, format):
+        self.g = make_custom_generator_class(20)()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, f"items.{format}")
+
+    def teardown(self, format):
+        self.tmpdir.cleanup()
+
+    def time_generate_to_file(self, format):
+        self.g.generate_to_file(self.path, self.num, seed=12345)
+
+    def peakmem_generate_to_file(self, format):
+        self.g.generate_to_file(self.path, 10 * self.num, seed=12345)
@@ -0,0 +1,69 @@
+"""
+Benchmarks for custom generators with (nested) @foreach loops.
+"""
+
+from tohu import CustomGenerator, Float, HashDigest, Integer, SelectOne, foreach
+
+from .common import items_per_second
+
+DATES = [f"2020-01-{day:02d}" for day in range(1, 11)]
+VENUES = ["Town A", "Town B", "Town C", "Town D", "Town E"]
+TEAMS = ["Red", "Green", "Blue", "Yellow"]
+
+
+@foreach(date=DATES)
+class OneLevelGenerator(CustomGenerator):
+    aa = date
+    bb = Integer(0, 1000)
+    cc = Float(0.0, 100.0, ndigits=2)
+    dd = SelectOne(["x", "y", "z"])
+    ee = HashDigest(length=8)
+
+
+@foreach(date=DATES)
+@foreach(venue=VENUES)
+class TwoLevelsGenerator(CustomGenerator):
+    aa = date
+    bb = venue
+    cc = Integer(0, 1000)
+    dd = Float(0.0, 100.0, ndigits=2)
+    ee = HashDigest(length=8)
+
+
+@foreach(date=DATES)
+@foreach(venue=VENUES)
+@foreach(team=TEAMS)
+class ThreeLevelsGenerator(CustomGenerator):
+    aa = date
+    bb = venue
+    cc = team
+    dd = Integer(0, 1000)
+    ee = HashDigest(length=8)
+
+
+FOREACH_GENERATORS = {1: OneLevelGenerator, 2: TwoLevelsGenerator, 3: ThreeLevelsGenerator}
+
+
+class ForeachLoops:
+    params = ([1, 2, 3], [1, 100])
+    param_names = ["loop_levels", "num_iterations"]
+
+    def setup(self, loop_levels, num_iterations):
+        self.g = FOREACH_GENERATORS[loop_levels]()
+
+    def time_generate_as_list(self, loop_levels, num_iterations):
+        self.g.generate_as_list(num_iterations=num_iterations, seed=12345)
+
+    def peakmem_generate_as_list(self, loop_levels, num_iterations):
+        self.g.generate_as_list(num_iterations=num_iterations, seed=12345)
+
+    def time_generate_columns(self, loop_levels, num_iterations):
+        self.g.generate_columns(num_iterations=num_iterations, seed=12345)
+
+    def track_items_per_second(self, loop_levels, num_iterations):
+        num_items = len(self.g.generate_as_list(num_iterations=num_iterations, seed=12345))
+        return items_per_second(
+            lambda num: self.g.generate_as_list(num_iterations=num_iterations, seed=12345), num_items
+        )
+
+    track_items_per_second.unit = "items/s"
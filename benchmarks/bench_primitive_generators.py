@@ -0,0 +1,42 @@
+"""
+Benchmarks for the primitive generators (one exemplar of each class).
+"""
+
+from tohu.primitive_generators import EXEMPLAR_PRIMITIVE_GENERATORS
+
+from .common import items_per_second
+
+EXEMPLARS = {g.__class__.__name__: g for g in EXEMPLAR_PRIMITIVE_GENERATORS}
+
+
+class PrimitiveGenerators:
+    params = list(EXEMPLARS)
+    param_names = ["generator"]
+
+    num = 10_000
+
+    def setup(self, name):
+        self.g = EXEMPLARS[name].spawn()
+        self.g.reset(seed=12345)
+
+    def time_generate_as_list(self, name):
+        self.g.generate_as_list(num=self.num)
+
+    def time_generate_batch(self, name):
+        self.g.generate_batch(self.num)
+
+    def time_skip(self, name):
+        self.g.skip(self.num)
+
+    def peakmem_generate_batch(self, name):
+        self.g.generate_batch(10 * self.num)
+
+    def track_items_per_second(self, name):
+        return items_per_second(lambda num: self.g.generate_as_list(num=num), self.num)
+
+    track_items_per_second.unit = "items/s"
+
+    def track_items_per_second_batch(self, name):
+        return items_per_second(self.g.generate_batch, self.num)
+
+    track_items_per_second_batch.unit = "items/s"
@@ -0,0 +1,58 @@
+"""
+Helpers shared by the benchmark modules.
+"""
+
+import time
+
+from tohu import Apply, Boolean, CustomGenerator, Float, HashDigest, Integer, SelectOne
+
+# Minimum time (in seconds) for which generators are run when measuring their throughput.
+MIN_DURATION = 0.2
+
+
+def items_per_second(func, num, *, min_duration=MIN_DURATION):
+    """
+    Repeatedly call `func(num)` (which is expected to produce `num` items)
+    for at least `min_duration` seconds and return the number of items
+    produced per second.
+    """
+    num_items = 0
+    start = time.perf_counter()
+    while True:
+        func(num)
+        num_items += num
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_duration:
+            return num_items / elapsed
+
+
+def make_field_generator(idx):
+    """
+    Return one of a handful of typical field generators, cycling through them based on `idx`.
+    """
+    field_generator_factories = [
+        lambda: Integer(0, 1000),
+        lambda: Float(0.0, 100.0, ndigits=2),
+        lambda: Boolean(p=0.3),
+        lambda: SelectOne(["aa", "bb", "cc", "dd"]),
+        lambda: HashDigest(length=8),
+    ]
+    return field_generator_factories[idx % len(field_generator_factories)]()
+
+
+def make_custom_generator_class(num_fields):
+    """
+    Return a custom generator class with `num_fields` fields of various types.
+    """
+    field_gens = {f"field_{idx:03d}": make_field_generator(idx) for idx in range(num_fields)}
+    return type(f"Wide{num_fields}Generator", (CustomGenerator,), field_gens)
+
+
+def make_apply_chain(depth):
+    """
+    Return an `Apply` generator at the end of a chain of `depth` nested `Apply` generators.
+    """
+    g = Integer(0, 1000)
+    for _ in range(depth):
+        g = Apply(lambda x: x + 1, g)
+    return g
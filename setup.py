@@ -32,6 +32,6 @@ setup(
     ],
     packages=["tohu"],
     install_requires=["attrs", "faker", "numpy", "pandas", "tqdm"],
-    extras_require={"dev": ["ipython", "jupyter"], "test": ["pytest"]},
+    extras_require={"dev": ["ipython", "jupyter"], "test": ["pytest"], "parquet": ["pyarrow"]},
     cmdclass=versioneer.get_cmdclass(),
 )
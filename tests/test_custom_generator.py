@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from .context import tohu
+from tohu import Apply, Boolean, CustomGenerator, Float, HashDigest, Integer, SelectOne
+
+
+class QuuxGenerator(CustomGenerator):
+    aa = Integer(100, 200)
+    bb = Float(0.0, 1.0, ndigits=4)
+    cc = HashDigest(length=8)
+    dd = SelectOne(["foo", "bar", "baz"])
+    ee = Boolean(p=0.3)
+    ff = Apply(lambda x, y: x + y, aa, bb)
+
+
+class NestedQuuxGenerator(CustomGenerator):
+    aa = Integer(0, 10)
+    bb = QuuxGenerator()
+
+
+class ChainGenerator(CustomGenerator):
+    aa = Integer(0, 1000)
+    bb = Apply(lambda x: x + 1, aa)
+    cc = Apply(lambda x, y: x * y, aa, y=bb)
+    dd = Apply(lambda x, y, z: (x, y, z), aa, bb, z=cc)
+    unused = Integer(0, 10)
+    unused.is_hidden = True
+
+
+def test_namespace_schedule_contains_generators_in_topological_order_and_prunes_unused_hidden_generators():
+    g = ChainGenerator()
+    ns = g._tohu_namespace
+
+    assert ns.schedule == [g.aa, g.bb, g.cc, g.dd]
+
+
+def test_apply_generators_in_namespace_produce_consistent_values():
+    g = ChainGenerator()
+    items = g.generate(num=20, seed=12345)
+
+    for x in items:
+        assert x.bb == x.aa + 1
+        assert x.cc == x.aa * x.bb
+        assert x.dd == (x.aa, x.bb, x.cc)
+
+    columns = g.generate_columns(num=20, seed=12345)
+    assert list(zip(*[col.tolist() for col in columns.values()])) == [(x.aa, x.bb, x.cc, x.dd) for x in items]
+
+
+def test_apply_generator_can_be_used_by_itself_after_generating_items():
+    g = ChainGenerator()
+    g.reset(seed=12345)
+    items = [next(g) for _ in range(10)]
+
+    g.reset(seed=12345)
+    g.generate(num=5)
+    assert [next(g.dd) for _ in range(5)] == [x.dd for x in items[5:]]
+
+
+def test_generate_columns_produces_same_values_as_generate():
+    g = QuuxGenerator()
+    items = g.generate(num=100, seed=12345)
+    columns = g.generate_columns(num=100, seed=12345)
+
+    assert list(columns.keys()) == ["aa", "bb", "cc", "dd", "ee", "ff"]
+    assert [tuple(x) for x in zip(*[col.tolist() for col in columns.values()])] == [x.as_tuple() for x in items]
+
+
+def test_generate_as_df_produces_same_dataframe_as_to_df():
+    g = QuuxGenerator()
+    df_expected = g.generate(num=100, seed=12345).to_df(fields={"new_aa": "aa", "new_cc": "cc"})
+    df = g.generate_as_df(num=100, seed=12345, fields={"new_aa": "aa", "new_cc": "cc"})
+
+    pd.testing.assert_frame_equal(df, df_expected, check_dtype=False)
+
+
+def test_generate_as_df_supports_nested_fields():
+    g = NestedQuuxGenerator()
+    fields = {"aa": "aa", "nested_aa": "bb.aa", "nested_dd": "bb.dd"}
+    df_expected = g.generate(num=30, seed=12345).to_df(fields=fields)
+    df = g.generate_as_df(num=30, seed=12345, fields=fields)
+
+    pd.testing.assert_frame_equal(df, df_expected, check_dtype=False)
+
+
+def test_sharded_generation_does_not_depend_on_number_of_worker_processes():
+    g = QuuxGenerator()
+    items_serial = g.generate(num=100, seed=12345, shard_size=30)
+    items_parallel = g.generate(num=100, seed=12345, shard_size=30, n_jobs=3)
+
+    assert len(items_serial) == 100
+    assert list(items_parallel) == list(items_serial)
+
+    # The first shard is the same as the first 30 items generated with the first shard seed
+    shard_seed = next(tohu.base.SeedGenerator().reset(12345))
+    assert list(items_serial)[:30] == list(g.generate(num=30, seed=shard_seed))
+
+
+def test_sharded_generation_without_fork_sends_snapshots_to_worker_processes(monkeypatch):
+    import multiprocessing
+
+    # Worker processes which aren't forked need to rebuild the generator from a snapshot.
+    monkeypatch.setattr(tohu.parallel, "_get_mp_context", lambda: multiprocessing.get_context("spawn"))
+
+    g = QuuxGenerator()
+    items_serial = g.generate(num=40, seed=12345, shard_size=20)
+    items_parallel = g.generate(num=40, seed=12345, shard_size=20, n_jobs=2)
+    assert list(items_parallel) == list(items_serial)
+
+
+def test_generate_with_single_job_produces_same_items_as_default_mode():
+    g = QuuxGenerator()
+    items_default = g.generate(num=50, seed=12345)
+    assert list(g.generate(num=50, seed=12345, n_jobs=1)) == list(items_default)
+
+    # With an explicit shard size, the items are the same for any number of jobs.
+    items_sharded = g.generate(num=50, seed=12345, shard_size=20)
+    assert list(g.generate(num=50, seed=12345, shard_size=20, n_jobs=1)) == list(items_sharded)
+    assert list(g.generate(num=50, seed=12345, shard_size=20, n_jobs=2)) == list(items_sharded)
+
+
+def test_parallel_results_are_produced_only_a_few_tasks_ahead_of_the_consumer():
+    from concurrent.futures import ThreadPoolExecutor
+
+    submitted_tasks = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            submitted_tasks.append(args)
+            return super().submit(fn, *args, **kwargs)
+
+    with RecordingExecutor(max_workers=2) as executor:
+        results = tohu.parallel._iter_pool_results(executor, pow, [(2, k) for k in range(100)], num_workers=2)
+        assert next(results) == 1
+        assert len(submitted_tasks) == 2 * tohu.parallel.NUM_PENDING_TASKS_PER_WORKER + 1
+        assert list(results) == [2 ** k for k in range(1, 100)]
+
+
+def test_seek_produces_same_items_as_generating_all_preceding_items():
+    g = QuuxGenerator()
+    items = g.generate(num=100, seed=12345)
+
+    g.seek(60)
+    assert list(g.generate(num=40)) == list(items)[60:]
+
+
+@pytest.mark.parametrize("format", ["csv", "jsonl", "parquet"])
+def test_generate_to_file_writes_same_items_as_generate(tmp_path, format):
+    if format == "parquet":
+        pytest.importorskip("pyarrow")
+
+    g = QuuxGenerator()
+    df_expected = g.generate(num=100, seed=12345).to_df(fields=["aa", "cc", "dd", "ee"])
+
+    path = str(tmp_path / f"items.{format}")
+    g.generate_to_file(path, num=100, seed=12345, fields=["aa", "cc", "dd", "ee"], chunk_size=30)
+
+    if format == "csv":
+        df = pd.read_csv(path)
+    elif format == "jsonl":
+        df = pd.read_json(path, lines=True, dtype={"cc": str})
+    else:
+        df = pd.read_parquet(path)
+
+    if format != "parquet":
+        # Text formats don't preserve the categorical type of the `SelectOne` column
+        df_expected["dd"] = df_expected["dd"].astype(str)
+
+    pd.testing.assert_frame_equal(df, df_expected, check_dtype=False)
+
+
+class OrderGenerator(CustomGenerator):
+    price = Float(1.0, 100.0, ndigits=2)
+    quantity = Integer(1, 10)
+    total = Apply(lambda p, q: p * q, price, quantity, dtype=np.float64, vectorized=True)
+
+
+def test_vectorized_apply_produces_same_values_in_columnar_and_row_mode():
+    g = OrderGenerator()
+    items = g.generate(num=100, seed=12345)
+    columns = g.generate_columns(num=100, seed=12345)
+
+    assert columns["total"].dtype == np.float64
+    assert columns["total"].tolist() == [x.total for x in items]
+    assert [x.total for x in items] == [x.price * x.quantity for x in items]
+
+
+def test_resume_from_checkpoint_produces_same_remaining_items(tmp_path):
+    g = QuuxGenerator()
+    expected = list(g.generate_as_stream(250, seed=12345, chunk_size=100))
+
+    checkpoints = []
+    stream = g.generate_as_stream(250, seed=12345, chunk_size=100, checkpoint_callback=checkpoints.append)
+    items = [next(stream) for _ in range(150)]
+    assert items == expected[:150]
+
+    # Checkpoints are only created once all items of a chunk have been consumed.
+    assert [c["num_generated"] for c in checkpoints] == [100]
+
+    path = str(tmp_path / "checkpoint.json")
+    tohu.checkpoints.save_checkpoint(checkpoints[-1], path)
+    checkpoint = tohu.checkpoints.load_checkpoint(path)
+
+    h = QuuxGenerator()
+    assert list(h.resume(checkpoint, chunk_size=30)) == expected[100:]
+
+
+def test_resume_raises_error_for_incompatible_checkpoint():
+    g = QuuxGenerator()
+    checkpoints = []
+    list(g.generate_as_stream(10, seed=12345, chunk_size=5, checkpoint_callback=checkpoints.append))
+
+    with pytest.raises(tohu.checkpoints.CheckpointError, match="Generator names in state do not match"):
+        ChainGenerator().resume(checkpoints[0])
+
+    with pytest.raises(tohu.checkpoints.CheckpointError, match="Unsupported checkpoint format version"):
+        g.resume({**checkpoints[0], "format_version": 999})
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from .context import tohu
+from tohu import Apply, Float, Integer, SelectOne
+
+
+def test_nested_apply_generators_produce_same_elements_via_next_and_generate_batch():
+    aa = Integer(0, 100)
+    bb = SelectOne(["x", "y", "z"])
+    g = Apply(lambda x, y: f"{x}{y}", Apply(lambda x: x * 2, Apply(lambda x: x + 1, aa)), y=bb)
+
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    elements = [next(g) for _ in range(100)]
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    batch = g.generate_batch(100)
+
+    assert batch.tolist() == elements
+
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    assert elements == [f"{2 * (next(aa) + 1)}{next(bb)}" for _ in range(100)]
+
+
+def test_apply_with_ufunc_is_evaluated_on_whole_arrays_in_batch_mode():
+    aa = Integer(0, 100)
+    bb = Float(0.0, 1.0)
+    g = Apply(np.multiply, aa, bb)
+
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    elements = [next(g) for _ in range(100)]
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    batch = g.generate_batch(100)
+
+    assert batch.dtype == np.float64
+    assert batch.tolist() == elements
+
+
+def test_vectorized_apply_produces_same_elements_via_next_and_generate_batch():
+    aa = Integer(0, 100)
+    bb = Float(0.0, 1.0)
+    g = Apply(lambda x, y: np.where(x > 50, x * y, -y), aa, y=bb, vectorized=True)
+
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    elements = [next(g) for _ in range(100)]
+    aa.reset(seed=12345)
+    bb.reset(seed=99999)
+    batch = g.generate_batch(100)
+
+    assert not any(isinstance(x, np.ndarray) for x in elements)
+    assert batch.dtype == np.float64
+    assert batch.tolist() == elements
+
+
+def test_vectorized_apply_raises_error_if_function_does_not_return_array_of_correct_length():
+    g = Apply(lambda x: x.sum(), Integer(0, 100), vectorized=True)
+
+    with pytest.raises(ValueError, match="Vectorized function must return an array of length 10"):
+        g.generate_batch(10)
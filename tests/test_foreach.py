@@ -0,0 +1,137 @@
+import pytest
+
+from .context import tohu
+from tohu import Apply, CustomGenerator, Float, HashDigest, Integer, SelectOne, foreach
+
+
+@foreach(date=["2020-01-01", "2020-01-02", "2020-01-03"])
+@foreach(venue=["Town A", "Town B"])
+class ForeachQuuxGenerator(CustomGenerator):
+    aa = date
+    bb = venue
+    cc = Integer(0, 1000)
+    dd = Float(0.0, 100.0, ndigits=2)
+    ee = HashDigest(length=8)
+    ff = SelectOne(["x", "y", "z"])
+    gg = Apply(lambda x, y: f"{x}/{y}", aa, ff)
+
+
+@pytest.mark.parametrize("num_iterations", [0, 3, 100, lambda date, venue: 1 if venue == "Town A" else 150])
+def test_generate_columns_produces_same_items_as_generate_as_list(num_iterations):
+    g = ForeachQuuxGenerator()
+    items = g.generate_as_list(num_iterations=num_iterations, seed=12345)
+    columns = g.generate_columns(num_iterations=num_iterations, seed=12345)
+
+    field_names = ["aa", "bb", "cc", "dd", "ee", "ff", "gg"]
+    assert list(columns) == ["date", "venue"] + field_names
+    assert all(len(values) == len(items) for values in columns.values())
+    assert list(zip(*[columns[name].tolist() for name in field_names])) == [x.as_tuple() for x in items]
+
+    # The loop variable columns contain the value of each loop variable for the combination of each item.
+    assert columns["date"].tolist() == columns["aa"].tolist()
+    assert columns["venue"].tolist() == columns["bb"].tolist()
+
+
+def test_generate_as_df():
+    g = ForeachQuuxGenerator()
+    df = g.generate_as_df(num_iterations=4, seed=12345, include_loop_variables=False)
+    items = g.generate_as_list(num_iterations=4, seed=12345)
+
+    assert list(df.columns) == ["aa", "bb", "cc", "dd", "ee", "ff", "gg"]
+    assert [tuple(row) for row in df.itertuples(index=False)] == [x.as_tuple() for x in items]
+    assert str(df["cc"].dtype) == "int64"
+
+
+@pytest.mark.parametrize("num_iterations", [5, [3, 1, 4, 1], lambda date, venue: 1 if venue == "Town A" else 20])
+def test_parallel_generation_produces_same_items_as_serial_generation(num_iterations):
+    g = ForeachQuuxGenerator()
+    items_serial = g.generate_as_list(num_iterations=num_iterations, seed=12345)
+    items_parallel = g.generate_as_list(num_iterations=num_iterations, seed=12345, n_jobs=3)
+
+    assert len(items_serial) > 0
+    assert items_parallel == items_serial
+
+
+def test_set_current_combination():
+    g = ForeachQuuxGenerator()
+    loop_runner = g.custom_gen_instance._tohu_namespace.loop_runner
+
+    loop_runner.set_current_combination(3)
+    g.custom_gen_instance.reset(seed=99)
+    item = next(g.custom_gen_instance)
+    assert (item.aa, item.bb) == ("2020-01-02", "Town B")
+    assert loop_runner.combination_at(3) == {"venue": "Town B", "date": "2020-01-02"}
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_generate_to_files(tmp_path, n_jobs):
+    import pandas as pd
+
+    g = ForeachQuuxGenerator()
+    filename_pattern = str(tmp_path / "venue={venue}" / "items.csv")
+    num_items_per_file = g.generate_to_files(filename_pattern, num_iterations=3, seed=12345, n_jobs=n_jobs)
+
+    # Items for the same venue (but different dates) are written to the same file, in loop order.
+    items = g.generate_as_list(num_iterations=3, seed=12345)
+    for venue in ["Town A", "Town B"]:
+        filename = filename_pattern.format(venue=venue)
+        assert num_items_per_file[filename] == 9
+        df = pd.read_csv(filename)
+        assert list(df["ee"]) == [x.ee for x in items if x.bb == venue]
+    assert list(num_items_per_file) == [filename_pattern.format(venue=venue) for venue in ["Town A", "Town B"]]
+
+
+class ReadingGenerator(CustomGenerator):
+    xx = Integer(0, 1000)
+    yy = SelectOne(["low", "high"])
+
+
+@foreach(venue=["Town A", "Town B"])
+class ForeachNestedGenerator(CustomGenerator):
+    aa = venue
+    bb = ReadingGenerator()
+
+
+def test_generate_to_files_supports_nested_fields(tmp_path):
+    import pandas as pd
+
+    g = ForeachNestedGenerator()
+    filename_pattern = str(tmp_path / "{venue}.csv")
+    fields = {"venue": "aa", "xx": "bb.xx", "yy": "bb.yy"}
+    g.generate_to_files(filename_pattern, num_iterations=5, seed=12345, fields=fields)
+
+    items = g.generate_as_list(num_iterations=5, seed=12345)
+    for venue in ["Town A", "Town B"]:
+        df = pd.read_csv(filename_pattern.format(venue=venue))
+        assert list(df.columns) == ["venue", "xx", "yy"]
+        assert list(df.itertuples(index=False, name=None)) == [(x.aa, x.bb.xx, x.bb.yy) for x in items if x.aa == venue]
+
+
+def test_filenames_for_filename_pattern_are_unique_and_in_loop_order():
+    g = ForeachQuuxGenerator()
+    loop_runner = g.custom_gen_instance._tohu_namespace.loop_runner
+
+    filenames = loop_runner.iter_loop_var_combinations_with_filename_pattern("{venue}.csv")
+    assert filenames == ["Town A.csv", "Town B.csv"]
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_resume_foreach_from_checkpoint_produces_same_remaining_items(n_jobs):
+    num_iterations = lambda date, venue: 0 if venue == "Town A" and date == "2020-01-02" else 7
+    g = ForeachQuuxGenerator()
+    expected = g.generate_as_list(num_iterations=num_iterations, seed=12345)
+
+    checkpoints = []
+    stream = g.generate_as_stream(
+        num_iterations=num_iterations, seed=12345, n_jobs=n_jobs, checkpoint_callback=checkpoints.append
+    )
+    assert list(stream) == expected
+    assert [c["num_generated"] for c in checkpoints] == [7, 14, 14, 21, 28, 35]
+
+    for checkpoint in checkpoints:
+        h = ForeachQuuxGenerator()
+        items = list(h.resume(checkpoint, num_iterations=num_iterations, n_jobs=n_jobs))
+        assert items == expected[checkpoint["num_generated"] :]
+
+    with pytest.raises(tohu.checkpoints.CheckpointError, match="Checkpoint does not match"):
+        ForeachQuuxGenerator().resume(checkpoints[0], num_iterations=3)
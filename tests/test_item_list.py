@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from .context import tohu
+from tohu import Apply, Boolean, Constant, CustomGenerator, Float, HashDigest, Integer, SelectOne
+
+
+class FoobarGenerator(CustomGenerator):
+    aa = Integer(100, 200)
+    bb = Float(0.0, 1.0, ndigits=4)
+    cc = HashDigest(length=8)
+    dd = SelectOne(["foo", "bar", "baz"])
+    ee = Boolean(p=0.3)
+    ff = Apply(lambda x, y: x * y, aa, bb)
+    gg = Constant(42)
+
+
+def test_to_df_uses_declared_field_dtypes():
+    df = FoobarGenerator().generate(num=50, seed=12345).to_df()
+
+    assert df["aa"].dtype == np.int64
+    assert df["bb"].dtype == np.float64
+    assert df["dd"].dtype == "category"
+    assert df["ee"].dtype == bool
+    assert df["ff"].dtype == np.float64  # inferred by pandas because `Apply` declares dtype=object
+    assert df["gg"].dtype == np.int64
+
+
+def test_to_df_produces_same_result_for_any_chunk_size():
+    item_list = FoobarGenerator().generate(num=50, seed=12345)
+    df_expected = item_list.to_df(fields={"new_dd": "dd", "new_aa": "aa", "new_ff": "ff"})
+
+    for chunk_size in [1, 7, 50, 1000]:
+        df = item_list.to_df(fields={"new_dd": "dd", "new_aa": "aa", "new_ff": "ff"}, chunk_size=chunk_size)
+        pd.testing.assert_frame_equal(df, df_expected)
+
+
+class QuuxGenerator(CustomGenerator):
+    aa = Integer(0, 10)
+    bb = FoobarGenerator()
+    cc = SelectOne(["x", None, "y"])
+
+
+def test_column_backed_item_list_contains_same_items_as_row_backed_one():
+    item_list_rows = FoobarGenerator().generate(num=50, seed=12345, storage="rows")
+    item_list_cols = FoobarGenerator().generate(num=50, seed=12345, storage="columns")
+
+    assert item_list_cols.is_column_backed and not item_list_rows.is_column_backed
+    assert len(item_list_cols) == 50
+    assert list(item_list_cols) == list(item_list_rows)
+    assert item_list_cols[3] == item_list_rows[3]
+    assert item_list_cols[-1] == item_list_rows[-1]
+    pd.testing.assert_frame_equal(item_list_cols.to_df(), item_list_rows.to_df())
+    pd.testing.assert_frame_equal(item_list_cols.head(3), item_list_rows.head(3))
+
+
+def test_column_backed_item_list_with_nested_items():
+    item_list_rows = QuuxGenerator().generate(num=20, seed=99999, storage="rows")
+    item_list_cols = QuuxGenerator().generate(num=20, seed=99999, storage="columns")
+
+    assert list(item_list_cols) == list(item_list_rows)
+    fields = {"aa": "aa", "nested_dd": "bb.dd", "cc": "cc"}
+    pd.testing.assert_frame_equal(item_list_cols.to_df(fields=fields), item_list_rows.to_df(fields=fields))
+
+
+def test_head_of_column_backed_item_list_only_exports_first_rows(monkeypatch):
+    item_list = FoobarGenerator().generate(num=1000, seed=12345, storage="columns")
+    df_expected = FoobarGenerator().generate(num=3, seed=12345).to_df()
+
+    exported_column_lengths = []
+    make_df_column = tohu.item_list.make_df_column
+
+    def make_df_column_and_record_length(values, dtype):
+        exported_column_lengths.append(len(values))
+        return make_df_column(values, dtype)
+
+    monkeypatch.setattr(tohu.item_list, "make_df_column", make_df_column_and_record_length)
+    pd.testing.assert_frame_equal(item_list.head(3), df_expected)
+    assert set(exported_column_lengths) == {3}
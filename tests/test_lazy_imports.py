@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from .context import tohu
+
+
+def test_importing_tohu_does_not_import_heavy_optional_dependencies():
+    code = (
+        "import sys, tohu; "
+        "g = tohu.Integer(low=0, high=10); g.generate_as_list(10, seed=12345); "
+        "print(' '.join(m for m in ['pandas', 'faker', 'tqdm', 'multiprocessing'] if m in sys.modules))"
+    )
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(tohu.__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=package_dir, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == ""
+
+
+def test_exemplar_primitive_generators_are_created_on_first_access():
+    import tohu.primitive_generators as pg
+
+    assert [g.__class__.__name__ for g in pg.EXEMPLAR_PRIMITIVE_GENERATORS] == [
+        "Constant",
+        "Boolean",
+        "Integer",
+        "Float",
+        "HashDigest",
+        "FakerGenerator",
+        "SelectOne",
+    ]
+    assert pg.EXEMPLAR_PRIMITIVE_GENERATORS is pg.EXEMPLAR_PRIMITIVE_GENERATORS
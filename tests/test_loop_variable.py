@@ -1,10 +1,49 @@
 import pytest
 
 from .context import tohu
-from tohu.looping import LoopVariable
+from tohu.looping import LoopRunner, LoopVariable
 
 
 @pytest.mark.parametrize("values", [True, "some_string", 12345])
 def test_values_arg_must_be_of_type_sequence(values):
     with pytest.raises(TypeError, match="Argument `values` must be a list, tuple, or similar sequence type"):
         LoopVariable(name="foo", values=values)
+
+
+def make_loop_runner():
+    loop_runner = LoopRunner()
+    loop_runner.add_loop_variable("x", LoopVariable(name="x", values=[10, 20, 30]).set_loop_level(1))
+    loop_runner.add_loop_variable("c", LoopVariable(name="c", values=["a", "b"]).set_loop_level(3))
+    loop_runner.add_loop_variable("y", LoopVariable(name="y", values=[1, 2, 3, 4]).set_loop_level(2))
+    loop_runner.add_loop_variable("z", LoopVariable(name="z", values=[5, 6, 7]).set_loop_level(2))
+    return loop_runner
+
+
+def test_combination_at_matches_enumeration():
+    loop_runner = make_loop_runner()
+    combinations = list(loop_runner.iter_loop_var_combinations())
+
+    assert loop_runner.num_combinations == 3 * 3 * 2
+    assert len(combinations) == loop_runner.num_combinations
+    assert combinations[0] == {"x": 10, "y": 1, "z": 5, "c": "a"}
+    assert combinations[1] == {"x": 20, "y": 1, "z": 5, "c": "a"}
+    assert combinations[-1] == {"x": 30, "y": 3, "z": 7, "c": "b"}
+    assert [loop_runner.combination_at(i) for i in range(len(combinations))] == combinations
+
+    with pytest.raises(IndexError):
+        loop_runner.combination_at(len(combinations))
+
+
+def test_num_iterations_at_higher_loop_level():
+    loop_runner = make_loop_runner()
+
+    expected = [({"y": y, "z": z, "c": c}, 6) for c in ["a", "b"] for (y, z) in [(1, 5), (2, 6), (3, 7)]]
+    assert list(loop_runner.iter_loop_var_combinations_with_num_iterations(2, loop_level=2)) == expected
+
+    expected = [({"y": y, "z": z, "c": c}, 10 + 20 + 30) for c in ["a", "b"] for (y, z) in [(1, 5), (2, 6), (3, 7)]]
+    num_iterations = lambda x, **kwargs: x
+    assert list(loop_runner.iter_loop_var_combinations_with_num_iterations(num_iterations, loop_level=2)) == expected
+
+    # If a sequence of values is exhausted, the last group only contains the iterations produced so far
+    result = list(loop_runner.iter_loop_var_combinations_with_num_iterations([1] * 8, loop_level=3))
+    assert result == [({"c": "a"}, 8)]
@@ -1,8 +1,11 @@
+import json
 import pytest
 import warnings
 
 from .context import tohu
-from tohu.primitive_generators import HashDigest
+from tohu.primitive_generators import Constant, Boolean, Integer, Float, HashDigest, FakerGenerator, SelectOne
+from tohu.primitive_generators import EXEMPLAR_PRIMITIVE_GENERATORS
+from tohu.base import SeekError
 
 
 def test_hashdigest_length_must_be_even_for_string_output():
@@ -18,3 +21,190 @@ def test_hashdigest_raises_warning_when_combining_as_bytes_with_lowercase():
 
         assert len(w) == 1
         assert "Ignoring `lowercase=True` because it has no effect when `as_bytes=True`" in str(w[-1].message)
+
+
+@pytest.mark.parametrize(
+    "g",
+    EXEMPLAR_PRIMITIVE_GENERATORS
+    + [
+        Constant((1, 2)),
+        Integer(low=-2 ** 40, high=2 ** 40),
+        Integer(low=0, high=2 ** 70),
+        Float(low=-1.0, high=1.0),
+        HashDigest(length=7, as_bytes=True),
+        HashDigest(length=10, lowercase=True),
+        SelectOne([("a", 1), ("b", 2)]),
+        SelectOne(["a", "b", "c", "d"], p=[0.1, 0.0, 0.6, 0.3]),
+        FakerGenerator(method="name", pool_size=100),
+    ],
+)
+def test_generate_batch_produces_same_elements_as_repeated_calls_to_next(g):
+    g.reset(seed=12345)
+    expected = [next(g) for _ in range(2500)]
+    expected_next_element = next(g)
+
+    # Note: the first batch is large enough to be produced in vectorized form, while
+    # small batches such as the second one may be produced element by element.
+    g.reset(seed=12345)
+    batch = g.generate_batch(2000).tolist() + g.generate_batch(500).tolist()
+    assert batch == expected
+    assert next(g) == expected_next_element
+
+    assert g.generate_as_list(2500, seed=12345) == expected
+
+
+@pytest.mark.parametrize(
+    "g",
+    EXEMPLAR_PRIMITIVE_GENERATORS
+    + [
+        Integer(low=0, high=2 ** 70),
+        HashDigest(length=0),
+        SelectOne(["a", "b", "c", "d"], p=[0.1, 0.0, 0.6, 0.3]),
+        FakerGenerator(method="name", pool_size=100),
+    ],
+)
+def test_skip_and_seek_are_equivalent_to_repeated_calls_to_next(g):
+    g.reset(seed=12345)
+    expected = [next(g) for _ in range(50)]
+
+    g.reset(seed=12345)
+    g.skip(20)
+    assert [next(g) for _ in range(30)] == expected[20:]
+
+    g.seek(7)
+    assert [next(g) for _ in range(43)] == expected[7:]
+
+
+def test_seek_raises_error_if_generator_was_not_reset():
+    g = Integer(low=0, high=100)
+    with pytest.raises(SeekError, match="Cannot seek because generator has not been reset"):
+        g.seek(10)
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS)
+def test_spawned_generators_continue_with_the_same_random_state(g):
+    # Spawning from a generator which has never been used (and thus whose random backend
+    # hasn't been created yet) must still produce generators with identical random states.
+    h1 = g.spawn()
+    h2 = g.spawn()
+    assert [next(h1) for _ in range(10)] == [next(h2) for _ in range(10)] == [next(g) for _ in range(10)]
+
+    g.reset(seed=12345)
+    next(g)
+    h = g.spawn()
+    assert [next(h) for _ in range(10)] == [next(g) for _ in range(10)]
+
+    # Spawned generators don't affect the original generator (or each other)
+    h1 = g.spawn()
+    h2 = g.spawn()
+    h1.reset(seed=99)
+    next(h1)
+    assert [next(g) for _ in range(10)] == [next(h2) for _ in range(10)]
+
+
+@pytest.mark.parametrize("g", [g for g in EXEMPLAR_PRIMITIVE_GENERATORS if not isinstance(g, Constant)])
+def test_generators_spawned_from_used_generator_share_random_state_snapshot(g):
+    g.reset(seed=12345)
+    next(g)
+    snapshot = g._get_rng_snapshot()
+    assert g._get_rng_snapshot() is snapshot
+    h1 = g.spawn()
+    h2 = g.spawn()
+    assert h1._rng_snapshot is h2._rng_snapshot is snapshot
+
+    # Once the original generator draws random numbers again, a new snapshot is taken.
+    expected = next(g)
+    assert g._get_rng_snapshot() is not snapshot
+    assert next(h1) == next(h2) == expected
+
+
+def test_faker_generator_raises_error_for_invalid_method():
+    with pytest.raises(AttributeError):
+        FakerGenerator(method="this_method_does_not_exist")
+
+
+def test_faker_generators_with_the_same_locale_share_faker_instance_but_not_random_state():
+    g1 = FakerGenerator(method="name")
+    g2 = FakerGenerator(method="name")
+    assert g1.fake is g2.fake
+
+    expected1 = g1.generate_as_list(20, seed=11)
+    expected2 = g2.generate_as_list(20, seed=22)
+
+    g1.reset(seed=11)
+    g2.reset(seed=22)
+    interleaved = [(next(g1), next(g2)) for _ in range(20)]
+    assert interleaved == list(zip(expected1, expected2))
+
+
+def test_faker_generator_supports_multiple_locales():
+    g1 = FakerGenerator(method="name", locale=["en_US", "de_DE"])
+    g2 = FakerGenerator(method="name", locale=["en_US", "de_DE"])
+    assert g1.fake is g2.fake
+
+    expected = g1.generate_as_list(20, seed=11)
+    assert g2.generate_as_list(20, seed=11) == expected
+
+    g1.reset(seed=11)
+    assert g1.generate_batch(20).tolist() == expected
+
+
+def test_pooled_faker_generator_samples_from_pool_which_can_be_cached_on_disk(tmp_path):
+    g = FakerGenerator(method="name", pool_size=50, pool_seed=7, pool_cache_dir=str(tmp_path))
+    assert len(g._pool) == len(set(g._pool)) == 50
+    assert g._pool == list(dict.fromkeys(FakerGenerator(method="name").generate_as_list(200, seed=7)))[:50]
+    assert set(g.generate_as_list(1000, seed=12345)) <= set(g._pool)
+    (cache_file,) = tmp_path.iterdir()
+
+    # The pool is loaded from disk (rather than regenerated) if it has been cached before
+    tohu.primitive_generators._faker_pools.clear()
+    with open(cache_file, "w") as f:
+        json.dump(["foo", "bar"], f)
+    h = FakerGenerator(method="name", pool_size=50, pool_seed=7, pool_cache_dir=str(tmp_path))
+    assert set(h.generate_as_list(20, seed=12345)) == {"foo", "bar"}
+
+    # Cache files which don't contain a list of plain values are ignored.
+    tohu.primitive_generators._faker_pools.clear()
+    with open(cache_file, "w") as f:
+        json.dump({"foo": "bar"}, f)
+    with pytest.warns(UserWarning, match="Ignoring invalid faker pool cache file"):
+        h = FakerGenerator(method="name", pool_size=50, pool_seed=7, pool_cache_dir=str(tmp_path))
+    assert h._pool == g._pool
+
+
+def test_pooled_faker_generator_only_caches_pools_of_json_compatible_values_on_disk(tmp_path):
+    g = FakerGenerator(method="date_object", pool_size=20, pool_cache_dir=str(tmp_path))
+    assert len(g._pool) == 20
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_select_one_with_probabilities():
+    g = SelectOne(["a", "b", "c", "d"], p=[1, 0, 6, 3])
+    values = g.reset(seed=12345).generate_batch(100_000)
+    frequencies = {x: (values == x).mean() for x in "abcd"}
+    assert frequencies["b"] == 0
+    assert frequencies == pytest.approx({"a": 0.1, "b": 0.0, "c": 0.6, "d": 0.3}, abs=0.01)
+
+    with pytest.raises(ValueError, match="Number of probabilities must be the same as the number of items"):
+        SelectOne(["a", "b"], p=[0.5, 0.3, 0.2])
+    with pytest.raises(ValueError, match="Weights must be finite and non-negative"):
+        SelectOne(["a", "b"], p=[1.5, -0.5])
+
+
+def test_spawned_select_one_generators_share_items():
+    g = SelectOne(range(1000), p=[1 / k for k in range(1, 1001)])
+    h = g.spawn()
+    assert h.items is g.items
+    assert h.generate_as_list(100, seed=12345) == g.generate_as_list(100, seed=12345)
+
+
+def test_generate_as_stream_reports_progress_once_per_chunk():
+    calls = []
+    g = Integer(low=0, high=100)
+    stream = g.generate_as_stream(
+        25, seed=12345, chunk_size=10, progress_callback=lambda num_generated, num: calls.append((num_generated, num))
+    )
+    assert calls == []  # nothing is generated until the stream is consumed
+
+    assert list(stream) == g.generate_as_list(25, seed=12345)
+    assert calls == [(10, 25), (20, 25), (25, 25)]
@@ -0,0 +1,95 @@
+import json
+import pytest
+
+from .context import tohu
+from tohu.primitive_generators import Boolean, Integer, Float, HashDigest, FakerGenerator, SelectOne
+from tohu.random_backends import RANDOM_BACKENDS, get_default_random_backend, set_default_random_backend
+
+
+def make_generators(random_backend):
+    return [
+        Boolean(p=0.3, random_backend=random_backend),
+        Integer(low=100, high=200, random_backend=random_backend),
+        Integer(low=0, high=2 ** 70, random_backend=random_backend),
+        Integer(low=0, high=3 * 2 ** 61 - 1, random_backend=random_backend),
+        Float(low=2.0, high=5.0, ndigits=3, random_backend=random_backend),
+        HashDigest(length=10, random_backend=random_backend),
+        FakerGenerator(method="name", random_backend=random_backend),
+        SelectOne(["aa", "bb", "cc"], random_backend=random_backend),
+    ]
+
+
+@pytest.mark.parametrize("random_backend", RANDOM_BACKENDS)
+def test_generators_produce_consistent_elements_with_all_random_backends(random_backend):
+    for g in make_generators(random_backend):
+        g.reset(seed=12345)
+        expected = [next(g) for _ in range(100)]
+
+        g.reset(seed=12345)
+        assert g.generate_batch(100).tolist() == expected
+
+        g.reset(seed=12345)
+        g.skip(37)
+        assert next(g) == expected[37]
+
+        g.seek(3)
+        g_spawned = g.spawn()
+        assert [next(g_spawned) for _ in range(10)] == expected[3:13]
+
+
+@pytest.mark.parametrize("random_backend", ["pcg64", "philox"])
+def test_skipping_with_jumpable_backends_is_fast(random_backend):
+    g = Float(low=0.0, high=1.0, random_backend=random_backend)
+    g.reset(seed=99999)
+    g.skip(10 ** 15)  # this would take forever if the elements were actually produced
+
+
+@pytest.mark.parametrize("random_backend", RANDOM_BACKENDS)
+def test_integers_with_large_non_power_of_two_range_are_unbiased(random_backend):
+    # Without rejecting some of the raw random words, the values in this range would
+    # not be equally likely, which shows up clearly in their residues modulo 3.
+    g = Integer(low=0, high=3 * 2 ** 61 - 1, random_backend=random_backend)
+    g.reset(seed=12345)
+    residues = g.generate_batch(30000) % 3
+    frequencies = [(residues == k).mean() for k in range(3)]
+    assert frequencies == pytest.approx([1 / 3, 1 / 3, 1 / 3], abs=0.015)
+
+
+@pytest.mark.parametrize("random_backend", RANDOM_BACKENDS)
+def test_generator_state_can_be_stored_as_json_and_restored(random_backend):
+    for g in make_generators(random_backend):
+        # The state of a generator which hasn't been used yet can be restored, too.
+        state_unused = json.loads(json.dumps(g.get_state()))
+        expected_unused = [next(g) for _ in range(10)]
+
+        g.reset(seed=12345)
+        g.skip(13)
+        state = json.loads(json.dumps(g.get_state()))
+        expected = [next(g) for _ in range(10)]
+
+        h = g.spawn()
+        h.reset(seed=99)
+        h.set_state(state)
+        assert [next(h) for _ in range(10)] == expected
+        h.set_state(state_unused)
+        assert [next(h) for _ in range(10)] == expected_unused
+
+
+def test_default_random_backend_can_be_changed_globally():
+    assert get_default_random_backend() == "mt19937"
+    try:
+        set_default_random_backend("philox")
+        assert Integer(low=0, high=10).rng.name == "philox"
+        assert Integer(low=0, high=10, random_backend="sfc64").rng.name == "sfc64"
+    finally:
+        set_default_random_backend("mt19937")
+
+    assert Integer(low=0, high=10).rng.name == "mt19937"
+
+
+def test_invalid_random_backend_raises_error():
+    with pytest.raises(ValueError, match="Invalid random backend: 'foo'"):
+        set_default_random_backend("foo")
+
+    with pytest.raises(ValueError, match="Invalid random backend: 'foo'"):
+        Integer(low=0, high=10, random_backend="foo")
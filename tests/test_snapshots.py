@@ -0,0 +1,132 @@
+import datetime as dt
+import multiprocessing
+import os
+import pytest
+import subprocess
+import sys
+
+from .context import tohu
+from tohu import Apply, CustomGenerator, Float, HashDigest, Integer, foreach
+from tohu.primitive_generators import EXEMPLAR_PRIMITIVE_GENERATORS, SelectOne
+from tohu.snapshots import SnapshotError, encode_snapshot, make_snapshot, restore_snapshot
+
+
+class BazGenerator(CustomGenerator):
+    aa = Integer(100, 200)
+    bb = Float(0.0, 1.0, ndigits=4)
+    cc = HashDigest(length=8)
+    dd = SelectOne(["foo", "bar", "baz"])
+    ee = Apply(lambda x, y: x + y, aa, bb)
+
+
+@foreach(date=["2020-01-01", "2020-01-02"])
+@foreach(venue=["Town A", "Town B"])
+class ForeachBazGenerator(CustomGenerator):
+    aa = date
+    bb = venue
+    cc = Integer(0, 1000)
+    dd = Apply(lambda x, y: f"{x}/{y}", aa, cc)
+
+
+@foreach(day=[dt.date(2020, 1, 1), dt.date(2020, 1, 2), dt.date(2020, 1, 3)])
+class DailyReadingGenerator(CustomGenerator):
+    aa = day
+    bb = Float(0.0, 100.0, ndigits=2)
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS + [SelectOne(["a", "b", "c"], p=[0.2, 0.3, 0.5])])
+def test_primitive_generators_can_be_restored_from_snapshot(g):
+    g.reset(seed=12345)
+    g.skip(17)
+    h = restore_snapshot(make_snapshot(g))
+
+    assert type(h) is type(g)
+    assert [next(h) for _ in range(20)] == [next(g) for _ in range(20)]
+
+
+def test_snapshot_stores_random_state_compactly():
+    g = Integer(low=0, high=100)
+    g.reset(seed=12345)
+
+    # The internal state of the Mersenne Twister consists of 624 32-bit words.
+    assert len(make_snapshot(g)) < 624 * 4 + 300
+
+
+def test_custom_generator_can_be_restored_from_snapshot_in_fresh_process():
+    g = BazGenerator()
+    g.reset(seed=12345)
+    g.skip(10)
+    snapshot = make_snapshot(g)
+    expected = [x.as_tuple() for x in g.generate_as_list(20)]
+
+    code = (
+        "import sys; from tohu.snapshots import restore_snapshot; "
+        "g = restore_snapshot(sys.stdin.buffer.read(), allow_import=True); "
+        "print(repr([x.as_tuple() for x in g.generate_as_list(20)]))"
+    )
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(tohu.__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", code], input=snapshot, cwd=package_dir, capture_output=True, check=True
+    )
+    assert output.stdout.decode().strip() == repr(expected)
+
+
+def test_foreach_generator_can_be_restored_from_snapshot():
+    g = ForeachBazGenerator().foreach(venue=["Town C"])
+    h = restore_snapshot(make_snapshot(g))
+
+    items = h.generate_as_list(num_iterations=4, seed=12345)
+    assert items == g.generate_as_list(num_iterations=4, seed=12345)
+    assert {x.bb for x in items} == {"Town C"}
+
+
+def test_invalid_snapshots_raise_error():
+    class LocalGenerator(CustomGenerator):
+        aa = Integer(low=0, high=100)
+
+    with pytest.raises(SnapshotError, match="not defined at the top level of a module"):
+        make_snapshot(LocalGenerator())
+
+    snapshot = make_snapshot(Integer(low=0, high=100))
+    with pytest.raises(SnapshotError, match="not a tohu snapshot"):
+        restore_snapshot(b"foobar" + snapshot)
+    with pytest.raises(SnapshotError, match="Unsupported snapshot format version"):
+        restore_snapshot(snapshot[:8] + b"\xff\xff" + snapshot[10:])
+    with pytest.raises(SnapshotError, match="Snapshot is truncated"):
+        restore_snapshot(snapshot[:-10])
+
+    header = snapshot[:10]
+    with pytest.raises(SnapshotError, match="Invalid value in snapshot"):
+        restore_snapshot(header + b"d\x01l\x00N")  # dict with a list as key
+    with pytest.raises(SnapshotError, match="Invalid value in snapshot"):
+        restore_snapshot(header + b"s\x02\xff\xfe")  # string which isn't valid UTF-8
+    with pytest.raises(SnapshotError, match="Invalid snapshot contents"):
+        restore_snapshot(header + b"l\x00")
+
+
+def test_restoring_snapshot_only_imports_modules_if_allowed():
+    # Importing this module would execute its code (which prints the Zen of Python).
+    assert "this" not in sys.modules
+    schema = {"kind": "custom", "class": "this:s", "init_args": [], "init_kwargs": {}, "loop_variables": {}}
+    with pytest.raises(SnapshotError, match="has not been imported"):
+        restore_snapshot(encode_snapshot(schema, {}))
+    assert "this" not in sys.modules
+
+
+def test_foreach_generator_with_loop_variable_values_which_are_not_plain_types_can_be_restored_from_snapshot():
+    g = DailyReadingGenerator()
+    h = restore_snapshot(make_snapshot(g))
+    assert h.generate_as_list(num_iterations=4, seed=12345) == g.generate_as_list(num_iterations=4, seed=12345)
+
+    # Values which differ from those in the class definition need to be stored in the snapshot.
+    with pytest.raises(SnapshotError):
+        make_snapshot(DailyReadingGenerator().foreach(day=[dt.date(2021, 1, 1)]))
+
+
+def test_foreach_generator_with_date_loop_variable_can_be_sent_to_spawned_workers(monkeypatch):
+    monkeypatch.setattr(tohu.parallel, "_get_mp_context", lambda: multiprocessing.get_context("spawn"))
+
+    g = DailyReadingGenerator()
+    items_serial = g.generate_as_list(num_iterations=5, seed=12345)
+    items_parallel = g.generate_as_list(num_iterations=5, seed=12345, n_jobs=2)
+    assert items_parallel == items_serial
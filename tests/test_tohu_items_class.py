@@ -1,9 +1,44 @@
+import attr
 import pytest
 
 from .context import tohu
-from tohu.tohu_items_class import derive_tohu_items_class_name
+from tohu.tohu_items_class import derive_tohu_items_class_name, make_tohu_items_class
 
 
 def test_raises_error_if_class_name_does_not_end_with_generator():
     with pytest.raises(ValueError, match="Custom generator class name must end with 'Generator'"):
         derive_tohu_items_class_name("Quux")
+
+
+def test_tohu_items_class_uses_slots():
+    Quux = make_tohu_items_class("Quux", ["aa", "bb"])
+    item = Quux(aa=1, bb="foo")
+
+    assert not hasattr(item, "__dict__")
+    with pytest.raises(attr.exceptions.FrozenInstanceError):
+        item.aa = 2
+
+
+def test_as_tuple_and_as_dict_are_equivalent_to_attrs_functions():
+    Foo = make_tohu_items_class("Foo", ["xx", "yy"])
+    Quux = make_tohu_items_class("Quux", ["aa", "bb", "cc"])
+    items = [Quux(aa=1, bb="foo", cc=None), Quux(aa=2.5, bb=Foo(xx=True, yy=b"x"), cc=(1, 2))]
+
+    for item in items:
+        assert item.as_tuple() == attr.astuple(item)
+        assert item.as_dict() == attr.asdict(item)
+
+
+def test_tohu_items_can_be_compared_with_tuples_dicts_and_other_items():
+    Quux = make_tohu_items_class("Quux", ["aa", "bb"])
+    item = Quux(aa=1, bb="foo")
+
+    assert item == Quux(aa=1, bb="foo")
+    assert item != Quux(aa=1, bb="bar")
+    assert item == (1, "foo")
+    assert item == {"aa": 1, "bb": "foo"}
+    assert item == make_tohu_items_class("Quux", ["aa", "bb"])(aa=1, bb="foo")
+    assert hash(item) == hash(Quux(aa=1, bb="foo"))
+
+    with pytest.raises(TypeError, match="Tohu items have types that cannot be compared"):
+        item == 42
@@ -6,6 +6,7 @@ from .primitive_generators import *
 from .derived_generators import Apply
 from .custom_generator import CustomGenerator
 from .foreach import foreach
+from .random_backends import get_default_random_backend, set_default_random_backend
 from .logging import logger as tohu_logger
 
 from ._version import get_versions
@@ -1,9 +1,14 @@
 import hashlib
 
 from abc import abstractmethod
-from itertools import islice
+from itertools import chain
 from random import Random
-from tqdm import tqdm
+
+from .checkpoints import check_checkpoint, make_checkpoint
+from .utils import make_object_array
+
+# Number of items which `generate_as_stream()` requests at a time via `generate_batch()`.
+DEFAULT_CHUNK_SIZE = 10_000
 
 
 class SeedGenerator:
@@ -35,6 +40,12 @@ class SeedGenerator:
         self.randgen.setstate(other.randgen.getstate())
 
 
+class SeekError(Exception):
+    """
+    Custom exception to indicate that a generator cannot seek to a given position.
+    """
+
+
 class TohuBaseGenerator:
     """
     Base class for all of tohu's generators.
@@ -45,6 +56,8 @@ class TohuBaseGenerator:
         self.clones = []
         self.parent = None  # this will only be set for cloned generators to point to their parents
         self.is_hidden = False  # this is used for loop variables
+        self.dtype = object  # type of the produced elements (used when exporting them, e.g. to a dataframe)
+        self._last_reset_seed = None  # this is used by seek() to determine the start of the sequence
 
     def __repr__(self):
         clsname = self.__class__.__name__
@@ -85,6 +98,25 @@ class TohuBaseGenerator:
 
     def _set_state_from(self, other):
         self.tohu_name = other.tohu_name
+        self._last_reset_seed = other._last_reset_seed
+
+    def get_state(self):
+        """
+        Return the current state of this generator as a dictionary of plain Python types
+        (which can be stored as JSON). Passing this to `set_state()` restores the state,
+        so that the generator continues to produce the same elements as it would have
+        after the call to `get_state()`.
+
+        Subclasses with additional state must extend this (and `set_state()`).
+        """
+        return {"last_reset_seed": self._last_reset_seed}
+
+    def set_state(self, state):
+        """
+        Restore the state of this generator from the result of `get_state()`.
+        """
+        self._last_reset_seed = state["last_reset_seed"]
+        return self
 
     def clone(self):
         new_gen = self.spawn(gen_mapping=None)
@@ -93,25 +125,194 @@ class TohuBaseGenerator:
         return new_gen
 
     def reset(self, seed):
+        self._last_reset_seed = seed
         for c in self.clones:
             c.reset(seed)
         return self
 
-    def generate_as_stream(self, num, *, seed=None, progressbar=False):
+    def skip(self, num):
+        """
+        Advance this generator by `num` elements without returning them.
+
+        This is equivalent to calling `next()` on this generator `num`
+        times, but typically much faster (see `_skip()`).
+        """
+        if num < 0:
+            raise ValueError(f"Cannot skip a negative number of elements. Got: num={num}")
+
+        self._skip(num)
+        return self
+
+    def _skip(self, num):
+        """
+        Helper method which implements `skip()`. Subclasses should override
+        this with a more efficient implementation if possible. This default
+        implementation produces the elements in chunks via `generate_batch()`
+        and discards them.
+        """
+        for _ in self._iter_chunks(num, DEFAULT_CHUNK_SIZE):
+            pass
+
+    def seek(self, idx):
+        """
+        Position this generator so that the next element it produces is the
+        element with index `idx` in the sequence produced since the most
+        recent call to `reset()` (where the first element has index 0).
+
+        This is achieved by resetting the generator with the same seed
+        and then calling `skip(idx)`.
+        """
+        if self._last_reset_seed is None:
+            raise SeekError(f"Cannot seek because generator has not been reset with an explicit seed: {self}")
+
+        self.reset(self._last_reset_seed)
+        return self.skip(idx)
+
+    def generate_batch(self, num):
+        """
+        Return a numpy array containing the next `num` elements.
+
+        The elements are the same as those produced by calling `next()`
+        on this generator `num` times. This default implementation does
+        exactly that, but subclasses can override it to produce all
+        elements in one go (which is typically much faster).
+        """
+        return make_object_array(next(self) for _ in range(num))
+
+    def _generate_chunk(self, num):
+        """
+        Return a list containing the next `num` elements. This is used internally by `generate_as_stream()`
+        and `generate_as_list()`, and subclasses can override it if they can produce lists more efficiently
+        than via `generate_batch()`.
+        """
+        return self.generate_batch(num).tolist()
+
+    def _iter_chunks(
+        self, num, chunk_size, *, seed=None, progress_callback=None, checkpoint_callback=None, num_generated=0
+    ):
+        """
+        Helper method which yields lists containing the next `num - num_generated` elements in chunks of `chunk_size`.
+
+        If `seed` is not None, the generator is reset (lazily, i.e. only once the first chunk is requested).
+        If `progress_callback` is given, it is called as `progress_callback(num_generated, num)` after each
+        chunk has been generated. If `checkpoint_callback` is given, it is called with a checkpoint (see
+        `tohu.checkpoints`) after each chunk has been consumed (i.e., once the next chunk is requested).
+        """
+        if seed is not None:
+            self.reset(seed)
+
+        while num_generated < num:
+            cur_chunk_size = min(chunk_size, num - num_generated)
+            chunk = self._generate_chunk(cur_chunk_size)
+            num_generated += cur_chunk_size
+            if progress_callback is not None:
+                progress_callback(num_generated, num)
+            yield chunk
+            if checkpoint_callback is not None:
+                checkpoint_callback(
+                    make_checkpoint("stream", num_generated=num_generated, num=num, state=self.get_state())
+                )
+
+    def generate_as_stream(
+        self,
+        num,
+        *,
+        seed=None,
+        progressbar=False,
+        progress_callback=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        checkpoint_callback=None,
+    ):
         """
         Return sequence of `num` elements.
 
         If `seed` is not None, the generator is reset
         using this seed before generating the elements.
+
+        Internally, the elements are produced in chunks of size
+        `chunk_size` via `generate_batch()`. Note that this means
+        that the generator may already have been advanced by up to
+        `chunk_size` elements beyond the ones consumed from the stream.
+
+        Progress is reported once per chunk (rather than once per element),
+        either by calling `progress_callback(num_generated, num)` or via a
+        progress bar (if `progressbar=True`, which requires `tqdm`).
+
+        If `checkpoint_callback` is given, it is called with a checkpoint
+        (a dictionary which can be stored as JSON, see `tohu.checkpoints`)
+        whenever all elements of a chunk have been consumed from the stream.
+        Passing the most recent checkpoint to `resume()` continues the stream
+        from this point (even in a different process).
         """
-        if seed is not None:
-            self.reset(seed)
+        if progressbar:  # pragma: no cover
+            progress_callback = _make_progressbar_callback(num, progress_callback)
+
+        # Note: chaining the chunks (rather than yielding the elements one by one
+        # from a generator function) avoids resuming a Python frame per element.
+        return chain.from_iterable(
+            self._iter_chunks(
+                num,
+                chunk_size,
+                seed=seed,
+                progress_callback=progress_callback,
+                checkpoint_callback=checkpoint_callback,
+            )
+        )
+
+    def resume(
+        self,
+        checkpoint,
+        *,
+        progressbar=False,
+        progress_callback=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        checkpoint_callback=None,
+    ):
+        """
+        Return the remaining elements of a stream produced by `generate_as_stream()`, starting
+        at the given checkpoint (which must have been created by a generator of the same kind).
+
+        The generator's state is restored from the checkpoint immediately. The remaining
+        elements are identical to those the original stream would have produced. Progress
+        and checkpoints are reported as in `generate_as_stream()`, with element counts
+        referring to the whole stream (including the elements produced before the checkpoint).
+        """
+        check_checkpoint(checkpoint, kind="stream")
+        self.set_state(checkpoint["state"])
 
-        items = islice(self, num)
+        num = checkpoint["num"]
         if progressbar:  # pragma: no cover
-            items = tqdm(items, total=num)
+            progress_callback = _make_progressbar_callback(num, progress_callback)
+
+        return chain.from_iterable(
+            self._iter_chunks(
+                num,
+                chunk_size,
+                progress_callback=progress_callback,
+                checkpoint_callback=checkpoint_callback,
+                num_generated=checkpoint["num_generated"],
+            )
+        )
+
+    def generate_as_list(self, num, *, seed=None, progressbar=False, progress_callback=None):
+        return list(
+            self.generate_as_stream(num, seed=seed, progressbar=progressbar, progress_callback=progress_callback)
+        )
+
+
+def _make_progressbar_callback(num, progress_callback=None):  # pragma: no cover
+    """
+    Return a progress callback which updates a tqdm progress bar (and calls `progress_callback`, if given).
+    """
+    from tqdm import tqdm
+
+    pbar = tqdm(total=num)
 
-        yield from items
+    def update_progressbar(num_generated, num):
+        pbar.update(num_generated - pbar.n)
+        if num_generated == num:
+            pbar.close()
+        if progress_callback is not None:
+            progress_callback(num_generated, num)
 
-    def generate_as_list(self, num, *, seed=None, progressbar=False):
-        return list(self.generate_as_stream(num, seed=seed, progressbar=progressbar))
+    return update_progressbar
@@ -0,0 +1,72 @@
+"""
+Checkpoints which allow to resume the generation of a long stream of items (e.g. after a crash).
+
+A checkpoint is a dictionary consisting of plain Python types (so that it can be stored as JSON)
+which records how many items have been generated so far, together with the state of the generator
+at this point (i.e., the random state of all its constituent generators and the current values of
+any loop variables). Checkpoints are produced by `generate_as_stream(..., checkpoint_callback=...)`,
+and the stream can be continued via `resume(checkpoint)`, which produces exactly the same remaining
+items as the original stream would have.
+"""
+
+import json
+import os
+
+__all__ = ["CHECKPOINT_FORMAT_VERSION", "CheckpointError", "save_checkpoint", "load_checkpoint"]
+
+# This needs to be increased whenever the structure of checkpoints changes in an incompatible way.
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+class CheckpointError(Exception):
+    """
+    Custom exception to indicate that a checkpoint is invalid or does not match the generator it is used with.
+    """
+
+
+def make_checkpoint(kind, *, num_generated, num, state, **extra_fields):
+    """
+    Return a checkpoint of the given kind (which is either "stream" or "foreach").
+    """
+    return {
+        "format_version": CHECKPOINT_FORMAT_VERSION,
+        "kind": kind,
+        "num_generated": num_generated,
+        "num": num,
+        **extra_fields,
+        "state": state,
+    }
+
+
+def check_checkpoint(checkpoint, kind):
+    """
+    Raise a `CheckpointError` if `checkpoint` is not a checkpoint of the given kind in the current format.
+    """
+    format_version = checkpoint.get("format_version")
+    if format_version != CHECKPOINT_FORMAT_VERSION:
+        raise CheckpointError(
+            f"Unsupported checkpoint format version: {format_version!r} (expected: {CHECKPOINT_FORMAT_VERSION})"
+        )
+    if checkpoint.get("kind") != kind:
+        raise CheckpointError(f"Expected checkpoint of kind {kind!r}. Got: {checkpoint.get('kind')!r}")
+
+
+def save_checkpoint(checkpoint, path):
+    """
+    Save a checkpoint to a JSON file.
+
+    The checkpoint is written to a temporary file first, so that `path` always
+    contains a complete checkpoint even if the process is killed while saving it.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Load a checkpoint from a JSON file (as written by `save_checkpoint()`).
+    """
+    with open(path) as f:
+        return json.load(f)
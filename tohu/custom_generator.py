@@ -1,8 +1,14 @@
+import numpy as np
+
 from abc import ABCMeta
-from .base import TohuBaseGenerator, SeedGenerator
-from .item_list import ItemList
+from .base import TohuBaseGenerator, SeedGenerator, DEFAULT_CHUNK_SIZE
+from .field_selector import FieldSelector
+from .file_writers import make_file_writer
+from .item_list import ItemList, get_column_for_field, make_df_column
+from .parallel import DEFAULT_SHARD_SIZE, make_shards, iter_shard_columns
 from .tohu_items_class import make_tohu_items_class, derive_tohu_items_class_name
 from .tohu_namespace import TohuNamespace
+from .utils import make_object_array
 
 
 def find_tohu_generators(x):
@@ -111,6 +117,12 @@ class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
     def __next__(self):
         return next(self._tohu_namespace)
 
+    def generate_batch(self, num):
+        return make_object_array(self._tohu_namespace.generate_list(num))
+
+    def _generate_chunk(self, num):
+        return self._tohu_namespace.generate_list(num)
+
     def reset(self, seed):
         # We construct a new internal seed by prepending the provided seed with
         # the class hierarchy of this generator. The purpoe of this is to avoid
@@ -123,9 +135,13 @@ class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
         str_class_hierarchy = ",".join([str(cls.__name__) for cls in self.__class__.__mro__])
         internal_seed = f"{str_class_hierarchy}{seed}"
         self._tohu_namespace.reset(internal_seed)
+        self._last_reset_seed = seed
 
         return self
 
+    def _skip(self, num):
+        self._tohu_namespace.skip(num)
+
     @property
     def loop_variables(self):
         return self._tohu_namespace.loop_variables
@@ -133,8 +149,156 @@ class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
     def advance_loop_variables(self):
         self._tohu_namespace.advance_loop_variables()
 
-    def generate(self, num, *, seed=None):
-        return ItemList(self.generate_as_list(num, seed=seed), self._tohu_namespace.tohu_items_class)
+    def generate(self, num, *, seed=None, n_jobs=None, shard_size=None, storage=None):
+        """
+        Generate `num` items and return them as an `ItemList`.
+
+        Parameters
+        ----------
+        num : int
+            Number of items to generate.
+        seed : int, optional
+            If given, the generator is reset with this seed first.
+        n_jobs : int, optional
+            If given, the items are generated in shards which are distributed across
+            `n_jobs` worker processes (use `n_jobs=-1` to use all available CPUs).
+        shard_size : int, optional
+            Number of items per shard (default: 100_000). Each shard is generated with
+            its own seed derived from `seed`, so that the result depends only on `seed`,
+            `num` and `shard_size` but not on the number of worker processes.
+        storage : str, optional
+            Either "rows" (the returned item list holds a list of individual items) or
+            "columns" (it holds a compact column store and only creates individual items
+            on demand, which requires much less memory for large numbers of items). By
+            default "columns" is used in the sharded mode and "rows" otherwise.
+
+        Note that the sharded mode (which is used if `shard_size` is given or `n_jobs` is
+        greater than 1) produces different items than the default mode for the same seed
+        because each shard is seeded separately. Passing `n_jobs=1` without a `shard_size`
+        is the same as not passing `n_jobs` at all. To get the same items for any value of
+        `n_jobs` (including 1), pass an explicit `shard_size`.
+        """
+        sharded = shard_size is not None or n_jobs not in (None, 1)
+        storage = storage or ("columns" if sharded else "rows")
+        if storage not in ("rows", "columns"):
+            raise ValueError(f"Invalid storage: {storage!r}. Must be one of: 'rows', 'columns'")
+
+        tohu_items_cls = self._tohu_namespace.tohu_items_class
+        if not sharded and storage == "rows":
+            return ItemList(self.generate_as_list(num, seed=seed), tohu_items_cls)
+
+        if sharded:
+            columns = self._generate_columns_sharded(num, seed=seed, n_jobs=n_jobs or 1, shard_size=shard_size)
+        else:
+            columns = self.generate_columns(num, seed=seed)
+
+        item_list = ItemList.from_columns(columns, tohu_items_cls)
+        if storage == "rows":
+            item_list = ItemList(item_list.items, tohu_items_cls)
+        return item_list
+
+    def _generate_columns_sharded(self, num, *, seed, n_jobs, shard_size):
+        seed_generator = SeedGenerator().reset(seed)
+        shards = make_shards(num, shard_size or DEFAULT_SHARD_SIZE, seed_generator)
+
+        columns_per_shard = list(iter_shard_columns(self, shards, n_jobs=n_jobs))
+        if columns_per_shard == []:
+            return self._tohu_namespace.generate_columns(0)
+
+        return {name: np.concatenate([cols[name] for cols in columns_per_shard]) for name in columns_per_shard[0]}
+
+    def generate_columns(self, num, *, seed=None):
+        """
+        Generate `num` items in columnar form, without creating individual item objects.
+
+        Parameters
+        ----------
+        num : int
+            Number of items to generate.
+        seed : int, optional
+            If given, the generator is reset with this seed first.
+
+        Returns
+        -------
+        columns : dict
+            Dictionary mapping each field name to a numpy array of length `num`.
+            The values are the same as those of the items returned by `generate()`
+            for the same seed.
+        """
+        if seed is not None:
+            self.reset(seed)
+
+        return self._tohu_namespace.generate_columns(num)
+
+    def generate_as_df(self, num, *, seed=None, fields=None):
+        """
+        Generate `num` items and return them directly as a pandas dataframe.
+
+        This is equivalent to `generate(num, seed=seed).to_df(fields=fields)`
+        but uses `generate_columns()` internally, so that no intermediate
+        item objects need to be created.
+        """
+        columns = self.generate_columns(num, seed=seed)
+        fs = FieldSelector(self._tohu_namespace.tohu_items_class, fields=fields)
+        return self._make_df_from_columns(columns, fs)
+
+    def _make_df_from_columns(self, columns, field_selector):
+        import pandas as pd
+
+        tohu_items_cls = self._tohu_namespace.tohu_items_class
+        field_dtypes = tohu_items_cls.field_dtypes
+        return pd.DataFrame(
+            {
+                new_name: make_df_column(
+                    get_column_for_field(columns, orig_name, tohu_items_cls), field_dtypes.get(orig_name, object)
+                )
+                for new_name, orig_name in field_selector.fields.items()
+            }
+        )
+
+    def generate_to_file(self, path, num, *, seed=None, format=None, fields=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Generate `num` items and write them to a file, without holding all of them in memory.
+
+        The items are produced in chunks of size `chunk_size` and each chunk
+        is written to the output file before the next one is generated, so
+        that peak memory usage depends on `chunk_size` but not on `num`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the output file.
+        num : int
+            Number of items to generate.
+        seed : int, optional
+            If given, the generator is reset with this seed first.
+        format : str, optional
+            One of "csv", "jsonl", "parquet" (the latter requires `pyarrow`).
+            If not given, the format is inferred from the file suffix.
+        fields : list or dict, optional
+            Subset of fields to export (see `ItemList.to_df()` for details).
+        chunk_size : int
+            Number of items to generate and write at a time.
+        """
+        if seed is not None:
+            self.reset(seed)
+
+        fs = FieldSelector(self._tohu_namespace.tohu_items_class, fields=fields)
+        with make_file_writer(path, format=format) as writer:
+            num_remaining = num
+            while num_remaining > 0 or writer.num_chunks_written == 0:
+                cur_chunk_size = min(chunk_size, num_remaining)
+                columns = self._tohu_namespace.generate_columns(cur_chunk_size)
+                writer.write_chunk(self._make_df_from_columns(columns, fs))
+                num_remaining -= cur_chunk_size
+
+    def get_state(self):
+        return {**super().get_state(), "generators": self._tohu_namespace.get_state()}
+
+    def set_state(self, state):
+        super().set_state(state)
+        self._tohu_namespace.set_state(state["generators"])
+        return self
 
     def assign_loop_variable_values(self, name, values):
         self._tohu_namespace.assign_loop_variable_values(name, values)
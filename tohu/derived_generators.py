@@ -1,25 +1,184 @@
+import numpy as np
+
+from itertools import chain, count, repeat
+
 from .base import TohuBaseGenerator
+from .utils import make_object_array
 
 __all__ = ["Apply"]
 
 
 class Apply(TohuBaseGenerator):
-    def __init__(self, func, *args, **kwargs):
+    def __init__(self, func, *args, dtype=object, vectorized=False, **kwargs):
+        """
+        Parameters
+        ----------
+        func: callable
+            Function which is applied to the elements produced by the input generators.
+        args, kwargs: TohuBaseGenerator
+            Input generators whose elements are passed to `func` as positional and
+            keyword arguments, respectively.
+        dtype: type or str, optional
+            Type of the values returned by `func` (this is used when exporting
+            elements, e.g. to a dataframe). Default: object.
+        vectorized: bool, optional
+            If True, `func` must also accept numpy arrays of input values (and return an
+            array of results of the same length). This allows to apply it to a whole batch
+            of elements at once in `generate_batch()` and when generating items in columnar
+            form. Numpy ufuncs (such as `np.add`) are detected automatically. Default: False.
+        """
         super().__init__()
         assert all([isinstance(g, TohuBaseGenerator) for g in args])
         assert all([isinstance(g, TohuBaseGenerator) for g in kwargs.values()])
         self.func = func
+        self.dtype = dtype
+        self.vectorized = vectorized
         self.arg_gens = [g.clone() for g in args]
         self.kwarg_gens = {name: g.clone() for name, g in kwargs.items()}
 
+        # If this generator is part of a tohu namespace, the namespace evaluates `func` directly
+        # on the values of the parent generators of `arg_gens` and `kwarg_gens`, so that these
+        # clones are not advanced along with them (see `TohuNamespace.compile()`). The following
+        # attributes allow to bring the clones up to date when this generator is used by itself.
+        self._namespace = None
+        self._num_namespace_ticks_at_last_sync = None
+
+        # Function which evaluates the tree of nested `Apply` generators below this one (see `_make_fused_next()`).
+        self._fused_next = None
+
+    @property
+    def is_vectorizable(self):
+        """
+        Whether `func` can be applied to whole numpy arrays of input values at once.
+        """
+        return self.vectorized or isinstance(self.func, np.ufunc)
+
+    @property
+    def scalar_func(self):
+        """
+        Function which is applied to individual elements of the input generators.
+
+        This is `func` itself, except for functions declared as `vectorized`, for
+        which any 0-dimensional array returned is converted to a scalar (so that the
+        elements are the same as those produced in batches).
+        """
+        if not self.vectorized:
+            return self.func
+
+        func = self.func
+
+        def scalar_func(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if isinstance(result, np.ndarray) and result.ndim == 0:
+                return result[()]
+            return result
+
+        return scalar_func
+
+    def _make_fused_next(self):
+        """
+        Return a function which produces the next element of this generator.
+
+        The function is compiled from generated source code which evaluates the whole tree of
+        nested `Apply` generators below this one in a single function body (calling `next()`
+        only on the generators at the leaves of the tree). This avoids the overhead of nested
+        calls to `next()` and of building argument lists for each of them.
+        """
+        globs = {}
+        lines = []
+        counter = count()
+
+        def add_node(g):
+            if isinstance(g, Apply):
+                args = [add_node(c) for c in g.arg_gens]
+                args += [f"{name}={add_node(c)}" for name, c in g.kwarg_gens.items()]
+                i = next(counter)
+                globs[f"func_{i}"] = g.scalar_func
+                lines.append(f"    v_{i} = func_{i}({', '.join(args)})")
+            else:
+                i = next(counter)
+                globs[f"next_{i}"] = g.__next__
+                lines.append(f"    v_{i} = next_{i}()")
+            return f"v_{i}"
+
+        result = add_node(self)
+        source = "def fused_next():\n" + "\n".join(lines) + f"\n    return {result}\n"
+        exec(compile(source, f"<tohu fused Apply {self.tohu_id}>", "exec"), globs)
+        return globs["fused_next"]
+
+    def _sync_input_clones_if_needed(self):
+        """
+        Copy the state of the parent generators to the input clones if the
+        namespace this generator belongs to has advanced them in the meantime.
+        """
+        if self._namespace is None or self._num_namespace_ticks_at_last_sync == self._namespace.num_ticks:
+            return
+
+        for g in chain(self.arg_gens, self.kwarg_gens.values()):
+            if isinstance(g.parent, Apply):
+                g.parent._sync_input_clones_if_needed()
+            g._set_state_from(g.parent)
+        self._num_namespace_ticks_at_last_sync = self._namespace.num_ticks
+
+    def apply_to_columns(self, num, arg_columns, kwarg_columns):
+        """
+        Return an array containing the results of applying `func` element-wise to
+        the given columns of input values (which must be numpy arrays of length `num`).
+
+        If `func` is declared as `vectorized` it is applied to all columns at once. The
+        same happens for numpy ufuncs as long as none of the columns have dtype `object`.
+        Otherwise `func` is called separately for each element.
+        """
+        func = self.func
+        all_columns = list(chain(arg_columns, kwarg_columns.values()))
+        if self.vectorized:
+            result = np.asarray(func(*arg_columns, **kwarg_columns))
+            if result.shape != (num,):
+                raise ValueError(
+                    f"Vectorized function must return an array of length {num} (same as its inputs). "
+                    f"Got: array of shape {result.shape}"
+                )
+            return result
+        elif self.is_vectorizable and all_columns and all(c.dtype != object for c in all_columns):
+            return func(*arg_columns, **kwarg_columns)
+
+        arg_columns = [c.tolist() for c in arg_columns]
+        kwarg_columns = {name: c.tolist() for name, c in kwarg_columns.items()}
+        if kwarg_columns:
+            names = list(kwarg_columns.keys())
+            all_args = zip(*arg_columns) if arg_columns else repeat((), num)
+            all_kwargs = (dict(zip(names, vals)) for vals in zip(*kwarg_columns.values()))
+            results = (func(*args, **kwargs) for args, kwargs in zip(all_args, all_kwargs))
+        elif arg_columns:
+            results = map(func, *arg_columns)
+        else:
+            results = (func() for _ in range(num))
+        return make_object_array(results)
+
     def __next__(self):
-        args = [next(g) for g in self.arg_gens]
-        kwargs = {name: next(g) for name, g in self.kwarg_gens.items()}
-        return self.func(*args, **kwargs)
+        self._sync_input_clones_if_needed()
+        if self._fused_next is None:
+            self._fused_next = self._make_fused_next()
+        return self._fused_next()
+
+    def generate_batch(self, num):
+        self._sync_input_clones_if_needed()
+        arg_columns = [g.generate_batch(num) for g in self.arg_gens]
+        kwarg_columns = {name: g.generate_batch(num) for name, g in self.kwarg_gens.items()}
+        return self.apply_to_columns(num, arg_columns, kwarg_columns)
 
     def reset(self, seed):
         super().reset(seed)
 
+    def _skip(self, num):
+        self._sync_input_clones_if_needed()
+        # Since the function is applied to the elements of the input generators
+        # it is sufficient to advance those (without calling the function).
+        for g in self.arg_gens:
+            g.skip(num)
+        for g in self.kwarg_gens.values():
+            g.skip(num)
+
     def spawn(self, gen_mapping=None):
         if gen_mapping is None:
             new_arg_gens = self.arg_gens
@@ -31,7 +190,7 @@ class Apply(TohuBaseGenerator):
             except KeyError:
                 raise ValueError("Generator mapping does not contain a value for some generator!")
 
-        new_gen = Apply(self.func, *new_arg_gens, **new_kwarg_gens)
+        new_gen = Apply(self.func, *new_arg_gens, dtype=self.dtype, vectorized=self.vectorized, **new_kwarg_gens)
         new_gen._set_state_from(self)
         return new_gen
 
@@ -41,3 +200,21 @@ class Apply(TohuBaseGenerator):
             g1._set_state_from(g2)
         for g1, g2 in zip(self.kwarg_gens.values(), other.kwarg_gens.values()):
             g1._set_state_from(g2)
+
+    def get_state(self):
+        self._sync_input_clones_if_needed()
+        return {
+            **super().get_state(),
+            "arg_gens": [g.get_state() for g in self.arg_gens],
+            "kwarg_gens": {name: g.get_state() for name, g in self.kwarg_gens.items()},
+        }
+
+    def set_state(self, state):
+        super().set_state(state)
+        for g, g_state in zip(self.arg_gens, state["arg_gens"]):
+            g.set_state(g_state)
+        for name, g in self.kwarg_gens.items():
+            g.set_state(state["kwarg_gens"][name])
+        if self._namespace is not None:
+            self._num_namespace_ticks_at_last_sync = self._namespace.num_ticks
+        return self
@@ -26,6 +26,21 @@ class FieldSelector:
         #
         self.field_selectors = {new_name: attrgetter(orig_name) for new_name, orig_name in self.fields.items()}
 
+        orig_names = list(self.fields.values())
+        if len(orig_names) == 1:
+            single_field_selector = attrgetter(orig_names[0])
+            self.tuple_selector = lambda item: (single_field_selector(item),)
+        elif len(orig_names) > 1:
+            self.tuple_selector = attrgetter(*orig_names)
+        else:
+            self.tuple_selector = lambda item: ()
+
     def __call__(self, items: typing.Iterable) -> typing.Iterable:
         for item in items:
             yield {name: f(item) for name, f in self.field_selectors.items()}
+
+    def iter_columns(self, items: typing.Iterable) -> typing.Iterable[tuple]:
+        """
+        Yield a tuple for each selected field which contains the field values of all items.
+        """
+        yield from zip(*map(self.tuple_selector, items))
@@ -0,0 +1,164 @@
+"""
+Writers which export generated items to files incrementally, one chunk at a time.
+
+This allows to write arbitrarily many items to a file while only ever keeping
+a single chunk of them in memory.
+"""
+
+import os
+
+__all__ = [
+    "FileWriter",
+    "CSVWriter",
+    "JSONLinesWriter",
+    "ParquetWriter",
+    "FILE_FORMATS",
+    "infer_file_format",
+    "make_file_writer",
+]
+
+
+class FileWriter:
+    """
+    Base class for incremental file writers.
+
+    Subclasses need to implement `_write_chunk()`, which receives a pandas
+    dataframe containing the next chunk of rows to be written.
+    """
+
+    def __init__(self, path, mode="w"):
+        self.path = path
+        self.mode = mode
+        self.num_chunks_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_chunk(self, df):
+        self._write_chunk(df)
+        self.num_chunks_written += 1
+
+    def _write_chunk(self, df):  # pragma: no cover
+        raise NotImplementedError(f"Class {self.__class__.__name__} does not implement method '_write_chunk'.")
+
+    def close(self):
+        pass
+
+
+class CSVWriter(FileWriter):
+    """
+    Write chunks of rows to a CSV file (the header is only written for the first chunk).
+    """
+
+    def __init__(self, path, mode="w", **to_csv_kwargs):
+        super().__init__(path, mode=mode)
+        self.to_csv_kwargs = to_csv_kwargs
+        self.write_header = mode == "w" or not os.path.exists(path) or os.path.getsize(path) == 0
+        self.f = open(path, mode, newline="")
+
+    def _write_chunk(self, df):
+        df.to_csv(self.f, header=self.write_header, index=False, **self.to_csv_kwargs)
+        self.write_header = False
+
+    def close(self):
+        self.f.close()
+
+
+class JSONLinesWriter(FileWriter):
+    """
+    Write chunks of rows to a JSON Lines file (with one JSON object per row).
+    """
+
+    def __init__(self, path, mode="w"):
+        super().__init__(path, mode=mode)
+        self.f = open(path, mode)
+
+    def _write_chunk(self, df):
+        if len(df) == 0:
+            return
+        output = df.to_json(orient="records", lines=True)
+        if not output.endswith("\n"):
+            output += "\n"
+        self.f.write(output)
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter(FileWriter):
+    """
+    Write chunks of rows to a Parquet file (each chunk becomes a separate row group).
+
+    This requires the optional dependency `pyarrow`. Note that Parquet files
+    cannot be appended to, so `mode` must be "w".
+    """
+
+    def __init__(self, path, mode="w"):
+        if mode != "w":
+            raise ValueError(f"Parquet files can only be written in mode 'w'. Got: mode={mode!r}")
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:  # pragma: no cover
+            raise ImportError("Writing Parquet files requires the optional dependency `pyarrow`.")
+
+        super().__init__(path, mode=mode)
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.writer = None
+
+    def _write_chunk(self, df):
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+FILE_FORMATS = {"csv": CSVWriter, "jsonl": JSONLinesWriter, "parquet": ParquetWriter}
+
+FILE_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet", ".pq": "parquet"}
+
+
+def infer_file_format(path):
+    """
+    Return the file format corresponding to the suffix of `path`.
+    """
+    _, suffix = os.path.splitext(path)
+    try:
+        return FILE_SUFFIXES[suffix.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Cannot infer file format from filename: {path!r}. "
+            f"Please specify the format explicitly (one of: {', '.join(FILE_FORMATS)})."
+        )
+
+
+def make_file_writer(path, format=None, mode="w"):
+    """
+    Return a file writer for the given path.
+
+    Parameters
+    ----------
+    path : str
+        Path of the output file.
+    format : str, optional
+        One of "csv", "jsonl", "parquet". If not given, the format
+        is inferred from the file suffix.
+    mode : str
+        Either "w" (overwrite any existing file) or "a" (append to it).
+    """
+    format = format or infer_file_format(path)
+    try:
+        writer_cls = FILE_FORMATS[format]
+    except KeyError:
+        raise ValueError(f"Invalid file format: {format!r}. Must be one of: {', '.join(FILE_FORMATS)}")
+
+    return writer_cls(path, mode=mode)
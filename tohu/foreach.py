@@ -1,11 +1,24 @@
 import inspect
+import os
+import numpy as np
 
-from .base import TohuBaseGenerator
+from functools import partial
+from .base import TohuBaseGenerator, DEFAULT_CHUNK_SIZE
+from .checkpoints import CheckpointError, check_checkpoint, make_checkpoint
 from .custom_generator import CustomGenerator
+from .field_selector import FieldSelector
+from .file_writers import make_file_writer
+from .item_list import get_numpy_dtype, make_df_column
 from .looping import LoopVariable
+from .parallel import iter_foreach_task_values, map_with_generator
+from .utils import make_object_array
 
 __all__ = ["foreach"]
 
+# Blocks of fewer items than this are produced as tuples of field values (rather than column by column)
+# in `ForeachGeneratorInstance.generate_columns()`, since this has less overhead for small blocks.
+SMALL_BLOCK_SIZE = 64
+
 
 def restore_globals(global_vars, names, clashes):
 
@@ -18,6 +31,61 @@ def restore_globals(global_vars, names, clashes):
             global_vars.pop(name)
 
 
+def _make_columns_from_value_tuples(value_tuples, field_dtypes):
+    """
+    Convert a list of tuples of field values to a dictionary mapping each field name to a numpy array.
+    """
+    columns = {}
+    for (name, dtype), values in zip(field_dtypes.items(), zip(*value_tuples)):
+        numpy_dtype = get_numpy_dtype(dtype)
+        columns[name] = make_object_array(values) if numpy_dtype == object else np.array(values, dtype=numpy_dtype)
+    return columns
+
+
+def _write_partition_file(custom_gen_instance, path, tasks, *, format, fields, chunk_size):
+    """
+    Write the items produced by the given @foreach tasks (see `LoopRunner.make_seeded_tasks()`)
+    to a single file, in order. Returns the number of items written.
+
+    The items are produced column by column and are written whenever at least `chunk_size`
+    of them have accumulated, so that small blocks of items are combined into larger chunks.
+    """
+    namespace = custom_gen_instance._tohu_namespace
+    fs = FieldSelector(namespace.tohu_items_class, fields=fields)
+    # Nested fields (such as "aa.bb") are extracted from the column of their top-level field when writing.
+    top_level_names = list(dict.fromkeys(name.partition(".")[0] for name in fs.fields.values()))
+
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    num_items_written = 0
+    with make_file_writer(path, format=format) as writer:
+        pending_columns = []
+        num_pending = 0
+
+        def write_pending_columns():
+            columns = {name: np.concatenate([cols[name] for cols in pending_columns]) for name in top_level_names}
+            writer.write_chunk(custom_gen_instance._make_df_from_columns(columns, fs))
+            pending_columns.clear()
+
+        for combination_idx, seed, num in tasks:
+            namespace.loop_runner.set_current_combination(combination_idx)
+            custom_gen_instance.reset(seed)
+            pending_columns.append(namespace.generate_columns(num))
+            num_pending += num
+            if num_pending >= chunk_size:
+                write_pending_columns()
+                num_items_written += num_pending
+                num_pending = 0
+
+        if pending_columns:
+            write_pending_columns()
+            num_items_written += num_pending
+
+    return num_items_written
+
+
 class ForeachGeneratorInstance:
     def __init__(self, custom_gen_instance: CustomGenerator):
         self.custom_gen_instance = custom_gen_instance
@@ -34,14 +102,283 @@ class ForeachGeneratorInstance:
 
         return ForeachGeneratorInstance(new_custom_gen_instance)
 
-    def generate_as_stream(self, *, num_iterations, seed=None):
+    def generate_as_stream(self, *, num_iterations, seed=None, n_jobs=None, checkpoint_callback=None):
+        """
+        Generate the items for all combinations of loop variable values.
+
+        Parameters
+        ----------
+        num_iterations : int, sequence or callable
+            Number of items to generate for each combination of loop variable values.
+        seed : int, optional
+            Seed used to reset the custom generator for each combination.
+        n_jobs : int, optional
+            If given, the combinations are distributed across `n_jobs` worker processes
+            (use `n_jobs=-1` to use all available CPUs). The items are still yielded in
+            the same order and are identical to those produced serially.
+        checkpoint_callback : callable, optional
+            If given, this is called with a checkpoint (see `tohu.checkpoints`) whenever
+            the items for a combination of loop variable values (or a chunk of them) have
+            been consumed. Passing the most recent checkpoint to `resume()` continues the
+            stream from this point. This requires an explicit `seed`.
+        """
         # FIXME: Demeter violation!
-        yield from self.custom_gen_instance._tohu_namespace.loop_runner.iter_loop_var_combinations_with_generator(
-            self.custom_gen_instance, num_iterations, seed=seed
+        loop_runner = self.custom_gen_instance._tohu_namespace.loop_runner
+
+        if checkpoint_callback is not None:
+            if seed is None:
+                raise ValueError("Creating checkpoints for @foreach loops requires an explicit seed.")
+            tasks = loop_runner.make_seeded_tasks(num_iterations, seed=seed)
+            yield from self._iter_items_with_checkpoints(
+                tasks, seed=seed, n_jobs=n_jobs, checkpoint_callback=checkpoint_callback
+            )
+        elif n_jobs is None:
+            yield from loop_runner.iter_loop_var_combinations_with_generator(
+                self.custom_gen_instance, num_iterations, seed=seed
+            )
+        else:
+            make_item = self.custom_gen_instance._tohu_namespace.tohu_items_class
+            tasks = loop_runner.make_seeded_tasks(num_iterations, seed=seed)
+            for value_tuples in iter_foreach_task_values(self.custom_gen_instance, tasks, n_jobs=n_jobs):
+                for values in value_tuples:
+                    yield make_item(*values)
+
+    def resume(self, checkpoint, *, num_iterations, n_jobs=None, checkpoint_callback=None):
+        """
+        Return the remaining items of a stream produced by `generate_as_stream()`, starting at
+        the given checkpoint. Since `num_iterations` can't be stored in the checkpoint (it may
+        be a function), the same value as for the original stream must be passed again.
+        """
+        check_checkpoint(checkpoint, kind="foreach")
+
+        # FIXME: Demeter violation!
+        loop_runner = self.custom_gen_instance._tohu_namespace.loop_runner
+        tasks = loop_runner.make_seeded_tasks(num_iterations, seed=checkpoint["seed"])
+        if len(tasks) != checkpoint["num_tasks"] or sum(num for _, _, num in tasks) != checkpoint["num"]:
+            raise CheckpointError("Checkpoint does not match the loop variables and `num_iterations` of this generator")
+
+        return self._iter_items_with_checkpoints(
+            tasks,
+            seed=checkpoint["seed"],
+            n_jobs=n_jobs,
+            checkpoint_callback=checkpoint_callback,
+            checkpoint=checkpoint,
         )
 
-    def generate_as_list(self, *, num_iterations, seed):
-        return list(self.generate_as_stream(num_iterations=num_iterations, seed=seed))
+    def _iter_items_with_checkpoints(self, tasks, *, seed, n_jobs, checkpoint_callback, checkpoint=None):
+        """
+        Yield the items produced by the given tasks (see `LoopRunner.make_seeded_tasks()`), starting at `checkpoint`
+        (if given), and call `checkpoint_callback` after each task (and each chunk of items within a task).
+
+        Checkpoints created between two tasks don't need to store the state of the custom generator since it
+        is reset anyway before the next task is processed. Only checkpoints within a task contain this state.
+        """
+        g = self.custom_gen_instance
+        loop_runner = g._tohu_namespace.loop_runner
+        make_item = g._tohu_namespace.tohu_items_class
+        num = sum(task_num for _, _, task_num in tasks)
+
+        if checkpoint is None:
+            task_idx, num_generated_in_task, num_generated = 0, 0, 0
+        else:
+            task_idx = checkpoint["task_idx"]
+            num_generated_in_task = checkpoint["num_generated_in_task"]
+            num_generated = checkpoint["num_generated"]
+
+        def report_checkpoint(task_idx, num_generated_in_task, state=None):
+            if checkpoint_callback is not None:
+                checkpoint_callback(
+                    make_checkpoint(
+                        "foreach",
+                        num_generated=num_generated,
+                        num=num,
+                        seed=seed,
+                        num_tasks=len(tasks),
+                        task_idx=task_idx,
+                        num_generated_in_task=num_generated_in_task,
+                        state=state,
+                    )
+                )
+
+        # Tasks are processed in the current process unless `n_jobs` is given, in which case only
+        # the remainder of a partially processed task (when resuming from a checkpoint) is.
+        while task_idx < len(tasks) and (n_jobs is None or num_generated_in_task > 0):
+            combination_idx, task_seed, task_num = tasks[task_idx]
+            if num_generated_in_task == 0:
+                loop_runner.set_current_combination(combination_idx)
+                g.reset(task_seed)
+            else:
+                g.set_state(checkpoint["state"])
+
+            while num_generated_in_task < task_num:
+                cur_chunk_size = min(DEFAULT_CHUNK_SIZE, task_num - num_generated_in_task)
+                yield from g._generate_chunk(cur_chunk_size)
+                num_generated_in_task += cur_chunk_size
+                num_generated += cur_chunk_size
+                if num_generated_in_task < task_num:
+                    report_checkpoint(task_idx, num_generated_in_task, state=g.get_state())
+
+            task_idx += 1
+            num_generated_in_task = 0
+            report_checkpoint(task_idx, 0)
+
+        if task_idx < len(tasks):
+            for value_tuples in iter_foreach_task_values(g, tasks[task_idx:], n_jobs=n_jobs):
+                for values in value_tuples:
+                    yield make_item(*values)
+                task_idx += 1
+                num_generated += len(value_tuples)
+                report_checkpoint(task_idx, 0)
+
+    def generate_as_list(self, *, num_iterations, seed, n_jobs=None):
+        return list(self.generate_as_stream(num_iterations=num_iterations, seed=seed, n_jobs=n_jobs))
+
+    def generate_to_files(
+        self,
+        filename_pattern,
+        *,
+        num_iterations,
+        seed=None,
+        format=None,
+        fields=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        n_jobs=None,
+    ):
+        """
+        Generate the items for all combinations of loop variable values and write them to
+        files whose names are obtained by substituting the loop variable values into
+        `filename_pattern` (for example, "sales/date={date}/store={store}.csv").
+
+        Combinations which map to the same filename are written to the same file (in loop order).
+        Each file is written in one go, so that only a single file is open at any time (per worker
+        process). Missing directories are created as needed.
+
+        Parameters
+        ----------
+        filename_pattern : str
+            Pattern for the output filenames, containing fields which refer to loop variables.
+        num_iterations : int, sequence or callable
+            Number of items to generate for each combination of loop variable values.
+        seed : int, optional
+            Seed used to reset the custom generator for each combination.
+        format : str, optional
+            One of "csv", "jsonl", "parquet" (the latter requires `pyarrow`).
+            If not given, the format is inferred from the suffix of each file.
+        fields : list or dict, optional
+            Subset of fields to export (see `ItemList.to_df()` for details).
+        chunk_size : int
+            Minimum number of items which are accumulated before writing them to a file.
+        n_jobs : int, optional
+            If given, the files are written by `n_jobs` worker processes (use `n_jobs=-1`
+            to use all available CPUs). The file contents are the same as without `n_jobs`.
+
+        Returns
+        -------
+        num_items_per_file : dict
+            Dictionary mapping each filename to the number of items written to it.
+        """
+        # FIXME: Demeter violation!
+        loop_runner = self.custom_gen_instance._tohu_namespace.loop_runner
+        get_filename = loop_runner.make_filename_function(filename_pattern)
+
+        tasks_per_file = {}
+        for task in loop_runner.make_seeded_tasks(num_iterations, seed=seed):
+            combination_idx, _, _ = task
+            filename = get_filename(loop_runner.combination_at(combination_idx))
+            tasks_per_file.setdefault(filename, []).append(task)
+
+        write_partition_file = partial(_write_partition_file, format=format, fields=fields, chunk_size=chunk_size)
+        num_items_per_file = map_with_generator(
+            self.custom_gen_instance, write_partition_file, list(tasks_per_file.items()), n_jobs=n_jobs or 1
+        )
+        return dict(zip(tasks_per_file, num_items_per_file))
+
+    def generate_columns(self, *, num_iterations, seed=None, include_loop_variables=True):
+        """
+        Generate the items for all combinations of loop variable values in columnar form.
+
+        The items for each combination are produced without creating individual item objects
+        (small blocks of items as plain tuples of field values, larger ones column by column
+        via `CustomGenerator.generate_columns()`) and converted to columns all at once.
+
+        Parameters
+        ----------
+        num_iterations : int, sequence or callable
+            Number of items to generate for each combination of loop variable values.
+        seed : int, optional
+            Seed used to reset the custom generator for each combination.
+        include_loop_variables : bool
+            If True (the default), the result contains an additional column for each loop
+            variable, holding the loop variable's value for the combination of each item.
+
+        Returns
+        -------
+        columns : dict
+            Dictionary mapping each loop variable name (if `include_loop_variables=True`) and each field
+            name to a numpy array. The items are the same as those returned by `generate_as_list()`.
+        """
+        # FIXME: Demeter violation!
+        namespace = self.custom_gen_instance._tohu_namespace
+        loop_runner = namespace.loop_runner
+
+        def generate_block(num):
+            if num < SMALL_BLOCK_SIZE:
+                return namespace.generate_value_tuples(num)
+            else:
+                return namespace.generate_columns(num)
+
+        field_dtypes = {name: g.dtype for name, g in namespace.field_generators.items()}
+        loop_var_values_per_block = []
+        num_items_per_block = []
+        columns_per_segment = []
+        pending_value_tuples = []
+
+        def flush_pending_value_tuples():
+            if pending_value_tuples:
+                columns_per_segment.append(_make_columns_from_value_tuples(pending_value_tuples, field_dtypes))
+                pending_value_tuples.clear()
+
+        for loop_var_values, num, block in loop_runner.iter_loop_var_combinations_with_generator_blocks(
+            self.custom_gen_instance, generate_block, num_iterations, seed=seed
+        ):
+            loop_var_values_per_block.append(loop_var_values)
+            num_items_per_block.append(num)
+            if isinstance(block, list):
+                pending_value_tuples.extend(block)
+            else:
+                flush_pending_value_tuples()
+                columns_per_segment.append(block)
+        flush_pending_value_tuples()
+
+        if columns_per_segment == []:
+            columns_per_segment = [namespace.generate_columns(0)]
+
+        columns = {}
+        if include_loop_variables:
+            for name in loop_runner.loop_variables:
+                values = make_object_array(loop_var_values[name] for loop_var_values in loop_var_values_per_block)
+                columns[name] = np.repeat(values, num_items_per_block)
+        for name in field_dtypes:
+            columns[name] = np.concatenate([cols[name] for cols in columns_per_segment])
+
+        return columns
+
+    def generate_as_df(self, *, num_iterations, seed=None, include_loop_variables=True):
+        """
+        Generate the items for all combinations of loop variable values and return them as a pandas dataframe.
+
+        This is equivalent to `generate_columns()` (see there for a description of the arguments),
+        but the result is converted to a dataframe.
+        """
+        import pandas as pd
+
+        columns = self.generate_columns(
+            num_iterations=num_iterations, seed=seed, include_loop_variables=include_loop_variables
+        )
+        field_dtypes = self.custom_gen_instance._tohu_namespace.tohu_items_class.field_dtypes
+        return pd.DataFrame(
+            {name: make_df_column(values, field_dtypes.get(name, object)) for name, values in columns.items()}
+        )
 
 
 class ForeachGeneratorClass:
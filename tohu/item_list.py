@@ -1,7 +1,120 @@
-import pandas as pd
-from typing import Union, List, Sequence, Dict, Type
+import numpy as np
+from operator import attrgetter
+from typing import Any, Union, List, Sequence, Dict, Type
 from .field_selector import FieldSelector
 
+# Number of items from which field values are extracted at a time in `ItemList.to_df()`.
+DEFAULT_TO_DF_CHUNK_SIZE = 65_536
+
+
+def get_numpy_dtype(dtype):
+    """
+    Return the numpy dtype used to hold field values of the given (declared) type.
+    Strings, bytes and categorical values are held in arrays of type `object`.
+    """
+    if dtype in (str, bytes, "category"):
+        return np.dtype(object)
+    return np.dtype(dtype)
+
+
+def make_df_column(values: np.ndarray, dtype):
+    """
+    Convert an array of field values to a column which can be passed to the
+    `pandas.DataFrame` constructor, taking into account their declared type.
+
+    Fields of type "category" are converted to `pandas.Categorical`. For fields
+    of (unspecific) type `object` we let pandas infer a better type if possible.
+    """
+    import pandas as pd
+
+    if dtype == "category":
+        return pd.Categorical(values)
+    elif dtype is object:
+        return pd.Series(values, dtype=object).infer_objects()
+    else:
+        return values
+
+
+def make_compact_column(values: Sequence, dtype):
+    """
+    Convert a sequence of field values to the compact representation used by
+    column-backed item lists.
+
+    Values of fields with a numeric or boolean type are held in a numpy array of
+    the corresponding type, and categorical values are held as `pandas.Categorical`
+    (i.e. as small integer codes plus the distinct categories). Everything else is
+    held in an array of type `object`.
+    """
+    if dtype == "category":
+        import pandas as pd
+
+        column = pd.Categorical(values)
+        if not (column.codes < 0).any():
+            return column
+        # Missing values such as `None` are not treated as regular categories by pandas,
+        # so we keep the original values in this case.
+        dtype = object
+
+    if isinstance(values, np.ndarray) and values.dtype == get_numpy_dtype(dtype):
+        return values
+    column = np.empty(len(values), dtype=get_numpy_dtype(dtype))
+    if column.dtype == object:
+        for idx, x in enumerate(values):
+            column[idx] = x
+    else:
+        column[:] = values
+    return column
+
+
+def _get_compact_column_values(column, start: int, stop: int) -> list:
+    """
+    Return a list of the (Python) values held in the given slice of a compact column.
+    """
+    if isinstance(column, np.ndarray):
+        return column[start:stop].tolist()
+    else:
+        # This is a `pandas.Categorical`
+        categories = np.asarray(column.categories, dtype=object)
+        return categories[column.codes[start:stop]].tolist()
+
+
+def get_column_for_field(
+    columns: Dict[str, Any], field_name: str, tohu_items_cls: Type, *, chunk_size: int = DEFAULT_TO_DF_CHUNK_SIZE
+):
+    """
+    Return the values of the given field from `columns`, which maps the top-level field names
+    to numpy arrays or compact columns. Nested fields (such as "aa.bb") are looked up on the
+    items stored in the column for the top-level field, `chunk_size` items at a time.
+    """
+    top_level_name, _, nested_name = field_name.partition(".")
+    try:
+        column = columns[top_level_name]
+    except KeyError:
+        raise AttributeError(f"{tohu_items_cls.__name__!r} object has no attribute {top_level_name!r}")
+
+    if nested_name == "":
+        return column
+
+    get_nested_value = attrgetter(nested_name)
+    num_items = len(column)
+    result = np.empty(num_items, dtype=object)
+    for start in range(0, num_items, chunk_size):
+        stop = min(start + chunk_size, num_items)
+        for idx, x in enumerate(_get_compact_column_values(column, start, stop), start=start):
+            result[idx] = get_nested_value(x)
+    return result
+
+
+def _get_first_compact_column_values(column, n: int):
+    """
+    Return a compact column holding the first `n` values of the given compact column.
+    """
+    if isinstance(column, np.ndarray):
+        return column[:n]
+    else:
+        # This is a `pandas.Categorical`
+        return column[:n].remove_unused_categories()
+
 
 class ItemList:
     """
@@ -10,14 +123,62 @@ class ItemList:
     It acts as an intermediary data structure which allows to conveniently explore items
     produced by a custom generator and export them to different formats while working
     interactively.
+
+    The items can either be stored as a list of tohu items (the default), or in a more
+    compact column store which holds the values of each field in a typed array (see
+    `ItemList.from_columns()`). In the latter case individual items are only created
+    on demand, e.g. when iterating over the item list.
     """
 
     def __init__(self, items: List, tohu_items_cls: Type):
         assert isinstance(items, list)
-        self.items = items
-        self.num_items = len(self.items)
+        self._items = items
+        self._columns = None
+        self.num_items = len(items)
         self.tohu_items_cls = tohu_items_cls
 
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence], tohu_items_cls: Type):
+        """
+        Create a column-backed item list from columns of field values
+        (e.g. as returned by `CustomGenerator.generate_columns()`).
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary mapping the field names of `tohu_items_cls` to sequences (or numpy
+            arrays) of field values. All sequences must have the same length.
+        tohu_items_cls : type
+            The tohu items class used to represent the individual items.
+        """
+        field_dtypes = getattr(tohu_items_cls, "field_dtypes", {})
+        compact_columns = {
+            name: make_compact_column(columns[name], field_dtypes.get(name, object))
+            for name in tohu_items_cls.field_names
+        }
+        num_items_per_column = {len(c) for c in compact_columns.values()}
+        if len(num_items_per_column) > 1:
+            raise ValueError("All columns must have the same length.")
+
+        item_list = cls([], tohu_items_cls)
+        item_list._items = None
+        item_list._columns = compact_columns
+        item_list.num_items = num_items_per_column.pop() if num_items_per_column else 0
+        return item_list
+
+    @property
+    def is_column_backed(self):
+        return self._columns is not None
+
+    @property
+    def items(self):
+        """
+        List of all items (for column-backed item lists this creates all items at once).
+        """
+        if self._items is not None:
+            return self._items
+        return list(self)
+
     def __repr__(self):
         return f"<ItemList containing {self.num_items} items>"
 
@@ -25,9 +186,29 @@ class ItemList:
         return self.num_items
 
     def __iter__(self):
-        return iter(self.items)
+        if not self.is_column_backed:
+            return iter(self._items)
+        return self._iter_items_from_columns()
+
+    def _iter_items_from_columns(self, chunk_size: int = DEFAULT_TO_DF_CHUNK_SIZE):
+        make_item = self.tohu_items_cls
+        columns = [self._columns[name] for name in self.tohu_items_cls.field_names]
+        for start in range(0, self.num_items, chunk_size):
+            stop = min(start + chunk_size, self.num_items)
+            values = [_get_compact_column_values(c, start, stop) for c in columns]
+            yield from (make_item(*vals) for vals in zip(*values))
 
-    def to_df(self, fields: Union[Sequence[str], Dict[str, str]] = None):
+    def __getitem__(self, idx: int):
+        if not self.is_column_backed:
+            return self._items[idx]
+
+        if not -self.num_items <= idx < self.num_items:
+            raise IndexError("ItemList index out of range")
+        idx = idx % self.num_items
+        columns = [self._columns[name] for name in self.tohu_items_cls.field_names]
+        return self.tohu_items_cls(*[_get_compact_column_values(c, idx, idx + 1)[0] for c in columns])
+
+    def to_df(self, fields: Union[Sequence[str], Dict[str, str]] = None, *, chunk_size: int = DEFAULT_TO_DF_CHUNK_SIZE):
         """
         Convert list of items to a pandas dataframe.
 
@@ -41,22 +222,73 @@ class ItemList:
             items should be of the form {<new_colname>: <field_name>},
             and this allows to specify different names for the columns of
             the resulting dataframes than the existing field names.
+        chunk_size : int
+            Number of items from which field values are extracted at a time.
 
         Returns
         -------
         result : pandas.DataFrame
         """
+        import pandas as pd
+
         fs = FieldSelector(self.tohu_items_cls, fields=fields)
-        df = pd.DataFrame(fs(self.items), columns=fs.fields)
-        return df
+        field_dtypes = getattr(self.tohu_items_cls, "field_dtypes", {})
+        dtypes = [field_dtypes.get(orig_name, object) for orig_name in fs.fields.values()]
+
+        if self.is_column_backed:
+            columns = [
+                get_column_for_field(self._columns, orig_name, self.tohu_items_cls, chunk_size=chunk_size)
+                for orig_name in fs.fields.values()
+            ]
+        else:
+            columns = self._extract_columns(fs, dtypes, chunk_size)
+
+        return pd.DataFrame(
+            {new_name: make_df_column(column, dtype) for new_name, column, dtype in zip(fs.fields, columns, dtypes)},
+            columns=list(fs.fields),
+            index=pd.RangeIndex(self.num_items),
+        )
+
+    def _extract_columns(self, fs: FieldSelector, dtypes: List, chunk_size: int) -> List[np.ndarray]:
+        """
+        Extract the values of the fields selected by `fs` from the stored items, `chunk_size` items at a time.
+        """
+        columns = [np.empty(self.num_items, dtype=get_numpy_dtype(dtype)) for dtype in dtypes]
+
+        for start in range(0, self.num_items, chunk_size):
+            chunk = self._items[start : start + chunk_size]
+            for column, values in zip(columns, fs.iter_columns(chunk)):
+                if column.dtype == object:
+                    for idx, x in enumerate(values, start=start):
+                        column[idx] = x
+                else:
+                    column[start : start + len(values)] = values
+
+        return columns
 
     def head(self, n: int = 5):
         """
         Return the first `n` rows after exporting items to a pandas dataframe.
 
+        Only the first `n` items are exported, so this is cheap even for very long item lists
+        (as a consequence, categorical columns only have the categories which occur in these rows).
+
         Parameters
         ----------
         n : int, default 5
             Number of rows to return.
         """
-        return self.to_df().head(n)
+        return self._get_first_items(n).to_df()
+
+    def _get_first_items(self, n: int):
+        """
+        Return an item list containing the first `n` items (which shares the underlying storage if possible).
+        """
+        if not self.is_column_backed:
+            return ItemList(self._items[:n], self.tohu_items_cls)
+
+        item_list = ItemList([], self.tohu_items_cls)
+        item_list._items = None
+        item_list._columns = {name: _get_first_compact_column_values(c, n) for name, c in self._columns.items()}
+        item_list.num_items = len(range(self.num_items)[:n])
+        return item_list
@@ -1,4 +1,8 @@
-from itertools import groupby
+import numpy as np
+
+from functools import reduce
+from itertools import chain, groupby, product
+from operator import mul
 from string import Formatter
 from typing import Callable, Dict, Optional, Sequence, Union
 
@@ -116,6 +120,16 @@ class LoopVariable(TohuBaseGenerator):
     def __next__(self):
         return self.cur_value
 
+    def generate_batch(self, num):
+        # Loop variables return the same value until they are advanced explicitly.
+        values = np.empty(num, dtype=object)
+        values.fill(self.cur_value)
+        return values
+
+    def _skip(self, num):
+        # Loop variables return the same value until they are advanced explicitly.
+        pass
+
     def __repr__(self):
         return f"<LoopVariable: name={self.name!r}, loop_level={self.loop_level!r}, values={self._values!r}, cur_value={self.cur_value!r}>"
 
@@ -143,6 +157,22 @@ class LoopVariable(TohuBaseGenerator):
         for c in self.clones:
             c.reset_loop_variable()
 
+    def set_current_index(self, idx):
+        self.idx = idx
+        self.cur_value = self.values[idx]
+
+        for c in self.clones:
+            c.set_current_index(idx)
+
+    def get_state(self):
+        return {**super().get_state(), "idx": self.idx}
+
+    def set_state(self, state):
+        super().set_state(state)
+        if state["idx"] is not None:
+            self.set_current_index(state["idx"])
+        return self
+
     def set_loop_level(self, loop_level):
         self.loop_level = loop_level
 
@@ -159,40 +189,113 @@ class LoopRunner:
     def __init__(self, loop_variables: Optional[Dict[str, LoopVariable]] = None):
         if loop_variables is None:
             self.loop_variables = {}
-            self.max_level = 0
         else:
             self.loop_variables = loop_variables
-            self.max_level = max([x.loop_level for _, x in self.loop_variables.items()])
+        self._update_loop_level_index()
 
     def add_loop_variable(self, name, loop_variable):
-        level = loop_variable.loop_level
-        self.max_level = max(self.max_level, level)
         self.loop_variables[name] = loop_variable
+        self._update_loop_level_index()
+
+    def _update_loop_level_index(self):
+        """
+        Precompute the loop variables at each loop level (so that we don't need to scan all
+        loop variables whenever we need the ones at a particular level).
+        """
+        self._loop_vars_by_level = {}
+        for name, x in self.loop_variables.items():
+            self._loop_vars_by_level.setdefault(x.loop_level, {})[name] = x
+        self.max_level = max(self._loop_vars_by_level, default=0)
 
     def get_loop_vars_at_level(self, loop_level: int):
-        return {name: x for (name, x) in self.loop_variables.items() if x.loop_level == loop_level}
+        return dict(self._loop_vars_by_level.get(loop_level, {}))
 
     def get_loop_vars_at_level_and_above(self, loop_level: int):
         return {name: x for (name, x) in self.loop_variables.items() if x.loop_level >= loop_level}
 
     def iter_loop_var_combinations_at_level(self, loop_level: int):
-        loop_vars_at_level = self.get_loop_vars_at_level(loop_level)
+        loop_vars_at_level = self._loop_vars_by_level.get(loop_level, {})
         var_names = loop_vars_at_level.keys()
 
         for cur_vals in zip(*[x.values for _, x in loop_vars_at_level.items()]):
             yield dict(zip(var_names, cur_vals))
 
+    def _get_loop_var_names_at_level_and_above(self, loop_level: int):
+        # Note: this is ordered by level (lowest level first), which is different from
+        # `get_loop_vars_at_level_and_above()` if the loop variables were not added in this order.
+        levels = range(loop_level, self.max_level + 1)
+        return [name for level in levels for name in self._loop_vars_by_level.get(level, {})]
+
+    def _get_num_values_at_level(self, loop_level: int):
+        # The loop variables at the same level are iterated over in parallel (like `zip()`).
+        loop_vars_at_level = self._loop_vars_by_level.get(loop_level, {})
+        return min((len(x.values) for x in loop_vars_at_level.values()), default=0)
+
+    def _get_num_combinations_below_level(self, loop_level: int):
+        return reduce(mul, (self._get_num_values_at_level(level) for level in range(1, loop_level)), 1)
+
+    @property
+    def num_combinations(self):
+        """
+        Total number of combinations of loop variable values (computed without enumerating them).
+        """
+        return self._get_num_combinations_below_level(self.max_level + 1)
+
+    def _get_value_indices_per_level(self, idx: int):
+        """
+        Return a dictionary mapping each loop level to the index of the loop variable
+        values at this level in the combination at position `idx`.
+        """
+        num_combinations = self.num_combinations
+        if not 0 <= idx < num_combinations:
+            raise IndexError(f"Combination index out of range: idx={idx} (number of combinations: {num_combinations})")
+
+        value_indices = {}
+        for level in range(1, self.max_level + 1):
+            idx, value_indices[level] = divmod(idx, self._get_num_values_at_level(level))
+        return value_indices
+
+    def combination_at(self, idx: int):
+        """
+        Return the combination of loop variable values at position `idx` in the sequence of
+        combinations produced by `iter_loop_var_combinations()`, without enumerating them.
+
+        The combinations are enumerated in mixed-radix order, where the loop variables at
+        level 1 correspond to the least significant "digit".
+        """
+        loop_var_values = {}
+        for level, value_idx in self._get_value_indices_per_level(idx).items():
+            for name, x in self._loop_vars_by_level[level].items():
+                loop_var_values[name] = x.values[value_idx]
+        return loop_var_values
+
+    def set_current_combination(self, idx: int):
+        """
+        Set the current values of all loop variables to the combination at position `idx`
+        (which is the same state as after resetting the loop variables and advancing them
+        `idx` times).
+        """
+        for level, value_idx in self._get_value_indices_per_level(idx).items():
+            for x in self._loop_vars_by_level[level].values():
+                x.set_current_index(value_idx)
+
     def iter_loop_var_combinations(self):
-        yield from self._iter_loop_var_value_combinations_impl(self.max_level)
+        yield from self._iter_loop_var_combinations_at_level_and_above(1)
 
-    def _iter_loop_var_value_combinations_impl(self, cur_level, **loop_var_values_at_higher_levels):
-        if cur_level == 0:
-            yield loop_var_values_at_higher_levels
-        else:
-            for cur_loop_var_values in self.iter_loop_var_combinations_at_level(cur_level):
-                yield from self._iter_loop_var_value_combinations_impl(
-                    cur_level - 1, **cur_loop_var_values, **loop_var_values_at_higher_levels
-                )
+    def _iter_loop_var_combinations_at_level_and_above(self, loop_level: int):
+        """
+        Yield all combinations of values of the loop variables at the given level and above,
+        where the values at the highest level change slowest. The resulting dictionaries
+        contain the loop variables ordered by level (lowest level first).
+        """
+        var_names = self._get_loop_var_names_at_level_and_above(loop_level)
+        # Tuples of (simultaneous) values of the loop variables at each level, highest level first.
+        value_tuples_per_level = [
+            list(zip(*[x.values for x in self._loop_vars_by_level.get(level, {}).values()]))
+            for level in range(self.max_level, loop_level - 1, -1)
+        ]
+        for value_tuples in product(*value_tuples_per_level):
+            yield dict(zip(var_names, chain.from_iterable(reversed(value_tuples))))
 
     def iter_loop_var_combinations_with_num_iterations(
         self, num_iterations: NumIterationsSpecifier, loop_level: int = 1
@@ -200,22 +303,24 @@ class LoopRunner:
         assert 1 <= loop_level and loop_level <= self.max_level
         if loop_level == 1:
             yield from self._iter_loop_var_combinations_with_num_iterations_at_level_1(num_iterations)
+        elif isinstance(num_iterations, int):
+            # Each combination at this level comprises the same number of combinations at level 1.
+            num_iterations_per_combination = num_iterations * self._get_num_combinations_below_level(loop_level)
+            for loop_var_values in self._iter_loop_var_combinations_at_level_and_above(loop_level):
+                yield loop_var_values, num_iterations_per_combination
         else:
-            loop_var_names_at_level_and_above = list(self.get_loop_vars_at_level_and_above(loop_level))
-
-            def key_func(loop_var_values_and_num_iterations):
-                loop_var_values = loop_var_values_and_num_iterations[0]
-                return {
-                    name: value
-                    for (name, value) in loop_var_values.items()
-                    if name in loop_var_names_at_level_and_above
-                }
-
-            data = self.iter_loop_var_combinations_with_num_iterations(num_iterations, loop_level=1)
-            grouped_data = groupby(data, key=key_func)
-            for key, grp in grouped_data:
-                num_iterations = [x[1] for x in grp]
-                yield key, sum(num_iterations)
+            # Consecutive blocks of combinations at level 1 (of size `stride`) correspond to
+            # the same combination of values at this level and above, so we group them by
+            # position instead of comparing the values themselves.
+            loop_var_names_at_level_and_above = self._get_loop_var_names_at_level_and_above(loop_level)
+            stride = self._get_num_combinations_below_level(loop_level)
+
+            data = enumerate(self.iter_loop_var_combinations_with_num_iterations(num_iterations, loop_level=1))
+            for _, grp in groupby(data, key=lambda idx_and_data: idx_and_data[0] // stride):
+                grp = [x for _, x in grp]
+                loop_var_values = grp[0][0]
+                key = {name: loop_var_values[name] for name in loop_var_names_at_level_and_above}
+                yield key, sum(num_iterations for _, num_iterations in grp)
 
     def _iter_loop_var_combinations_with_num_iterations_at_level_1(self, num_iterations: NumIterationsSpecifier):
         num_iterations = make_num_iterations_specifier(num_iterations)
@@ -244,7 +349,7 @@ class LoopRunner:
             x.reset_loop_variable()
 
     def reset_loop_vars_at_level(self, loop_level):
-        for _, x in self.get_loop_vars_at_level(loop_level).items():
+        for x in self._loop_vars_by_level.get(loop_level, {}).values():
             x.reset_loop_variable()
 
     def advance_loop_variables(self, loop_level=1):
@@ -252,7 +357,7 @@ class LoopRunner:
             raise LoopExhausted("Loop has been exhausted.")
 
         try:
-            for _, x in self.get_loop_vars_at_level(loop_level).items():
+            for x in self._loop_vars_by_level.get(loop_level, {}).values():
                 x.advance()
         except LoopVariableExhausted:
             self.reset_loop_vars_at_level(loop_level)
@@ -277,13 +382,66 @@ class LoopRunner:
         self.reset_all_loop_variables()
         yield from self.iter_loop_var_combinations_with_callback(f_callback, num_iterations)
 
-    def iter_loop_var_combinations_with_filename_pattern(self, filename_pattern: str):
+    def iter_loop_var_combinations_with_generator_blocks(
+        self, g: TohuBaseGenerator, generate_block: Callable, num_iterations: NumIterationsSpecifier, seed: int
+    ):
+        """
+        Block-wise version of `iter_loop_var_combinations_with_generator()`.
+
+        For each combination of loop variable values, `g` is reset in the same way as in
+        `iter_loop_var_combinations_with_generator()` and then `generate_block(num)` is called
+        (which is expected to produce the next `num` items of `g` in some form, e.g. as columns).
+        This yields tuples `(loop_var_values, num, block)`, where `block` is the result of this call.
+        """
+        seed_generator = SeedGenerator()
+        seed_generator.reset(seed)
+
+        def f_callback(num_iterations, **loop_var_values):
+            g.reset(next(seed_generator))
+            yield loop_var_values, num_iterations, generate_block(num_iterations)
+            try:
+                self.advance_loop_variables()
+            except LoopExhausted:
+                return
+
+        self.reset_all_loop_variables()
+        yield from self.iter_loop_var_combinations_with_callback(f_callback, num_iterations)
+
+    def make_seeded_tasks(self, num_iterations: NumIterationsSpecifier, seed: int):
+        """
+        Return a list of tuples `(combination_idx, seed, num)`, one for each combination of loop
+        variable values, where `seed` and `num` are the seed used to reset the generator and the
+        number of items produced for this combination by `iter_loop_var_combinations_with_generator()`.
+
+        Since the tasks are independent of each other, they can be processed in any order (or
+        in parallel) after calling `set_current_combination(combination_idx)` for each of them.
+        """
+        seed_generator = SeedGenerator()
+        seed_generator.reset(seed)
+
+        return [
+            (idx, next(seed_generator), num)
+            for idx, (_, num) in enumerate(self.iter_loop_var_combinations_with_num_iterations(num_iterations))
+        ]
+
+    def make_filename_function(self, filename_pattern: str):
+        """
+        Return a function which maps a dictionary of loop variable values to the filename
+        obtained by substituting the relevant values into `filename_pattern`.
+        """
         fmt_lst = list(Formatter().parse(filename_pattern))
         param_names = [field_name for (_, field_name, _, _) in fmt_lst if field_name is not None]
-        filenames = []
+
+        def get_filename(loop_var_values):
+            return filename_pattern.format(**{name: loop_var_values[name] for name in param_names})
+
+        return get_filename
+
+    def iter_loop_var_combinations_with_filename_pattern(self, filename_pattern: str):
+        get_filename = self.make_filename_function(filename_pattern)
+        # Note: we use a dict (rather than a list) to remove duplicates because membership tests are
+        # much faster, and since dicts preserve insertion order the filenames are still in loop order.
+        filenames = {}
         for loop_var_values in self.iter_loop_var_combinations():
-            param_values = {name: value for name, value in loop_var_values.items() if name in param_names}
-            cur_filename = filename_pattern.format(**param_values)
-            if cur_filename not in filenames:
-                filenames.append(cur_filename)
-        return filenames
+            filenames[get_filename(loop_var_values)] = None
+        return list(filenames)
@@ -0,0 +1,160 @@
+"""
+Helpers for drawing whole batches of random values from a `random.Random` instance.
+
+Python's `random.Random` and numpy's `MT19937` bit generator both implement the
+Mersenne Twister and use the same internal state layout (624 words plus a position
+index). This allows us to hand the state of a `random.Random` instance over to numpy,
+draw a large number of raw 32-bit words in a single call, apply the same transformations
+as CPython does for `random()`, `getrandbits()` and `_randbelow()` in vectorised form,
+and finally hand the advanced state back.
+
+The values produced by the functions below are therefore identical to those obtained by
+calling the corresponding `random.Random` method `num` times in a row, and the state of
+`randgen` afterwards is the same as well.
+"""
+
+import numpy as np
+
+from random import Random
+
+__all__ = ["random_batch", "randbelow_batch", "randbytes_batch", "skip_words", "MAX_VECTORIZED_RANDBELOW_BITS"]
+
+# Largest bit length of `n` for which `randbelow_batch` can operate on int64 arrays.
+MAX_VECTORIZED_RANDBELOW_BITS = 63
+
+# Maximum number of words drawn at once when skipping (to limit memory usage).
+SKIP_CHUNK_SIZE = 2 ** 20
+
+
+def _make_bit_generator(randgen: Random):
+    """
+    Return a numpy `MT19937` bit generator whose state is a copy of the state of `randgen`.
+    """
+    _, internal_state, _ = randgen.getstate()
+    bitgen = np.random.MT19937()
+    bitgen.state = {
+        "bit_generator": "MT19937",
+        "state": {"key": np.array(internal_state[:624], dtype=np.uint32), "pos": internal_state[624]},
+    }
+    return bitgen
+
+
+def _copy_state_from_bit_generator(randgen: Random, bitgen):
+    """
+    Update the state of `randgen` so that it continues where `bitgen` left off.
+    """
+    version, _, gauss_next = randgen.getstate()
+    state = bitgen.state["state"]
+    randgen.setstate((version, tuple(state["key"].tolist()) + (int(state["pos"]),), gauss_next))
+
+
+def random_batch(randgen: Random, num: int):
+    """
+    Return an array of `num` floats which is identical to `[randgen.random() for _ in range(num)]`.
+
+    Like CPython's `random()`, each float is assembled from two consecutive
+    32-bit words (of which the top 27 and 26 bits are used, respectively).
+    """
+    bitgen = _make_bit_generator(randgen)
+    words = bitgen.random_raw(2 * num).reshape(num, 2)
+    _copy_state_from_bit_generator(randgen, bitgen)
+
+    a = words[:, 0] >> np.uint64(5)
+    b = words[:, 1] >> np.uint64(6)
+    return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+
+def randbytes_batch(randgen: Random, length: int, num: int):
+    """
+    Return `num` consecutive blocks of `length` random bytes (concatenated into a single bytes object).
+
+    Each block is produced from a whole number of 32-bit words (interpreted as little-endian),
+    discarding any surplus bytes. This mirrors the legacy `numpy.random.RandomState.bytes()`
+    method, so that the result is the same as `num` calls to `RandomState.bytes(length)`
+    if the states of both generators are the same.
+    """
+    num_words_per_block = (length + 3) // 4
+    bitgen = _make_bit_generator(randgen)
+    words = bitgen.random_raw(num * num_words_per_block).astype("<u4")
+    _copy_state_from_bit_generator(randgen, bitgen)
+    return words.view(np.uint8).reshape(num, 4 * num_words_per_block)[:, :length].tobytes()
+
+
+def skip_words(randgen: Random, num_words: int):
+    """
+    Advance the state of `randgen` by `num_words` 32-bit words.
+
+    Note that the Mersenne Twister does not support cheap jump-ahead by an
+    arbitrary amount, so this still takes time linear in `num_words`, but
+    since the words are drawn in large chunks by numpy it is very fast.
+    """
+    bitgen = _make_bit_generator(randgen)
+    num_remaining = num_words
+    while num_remaining > 0:
+        cur_chunk_size = min(SKIP_CHUNK_SIZE, num_remaining)
+        bitgen.random_raw(cur_chunk_size)
+        num_remaining -= cur_chunk_size
+    _copy_state_from_bit_generator(randgen, bitgen)
+
+
+def _getrandbits_batch(bitgen, k: int, num_words: int):
+    """
+    Return the values of `num_words // num_words_per_value` consecutive calls to `getrandbits(k)`.
+
+    This mirrors CPython's implementation, which for k <= 32 discards the lower bits of a single
+    word and for 32 < k <= 64 combines two words (the first one being the least significant).
+    """
+    if k <= 32:
+        words = bitgen.random_raw(num_words)
+        return (words >> np.uint64(32 - k)).astype(np.int64)
+    else:
+        words = bitgen.random_raw(num_words).reshape(-1, 2)
+        return (words[:, 0] | ((words[:, 1] >> np.uint64(64 - k)) << np.uint64(32))).astype(np.int64)
+
+
+def randbelow_batch(randgen: Random, n: int, num: int):
+    """
+    Return an int64 array of `num` integers which is identical to the values
+    produced by `num` consecutive calls of `randgen._randbelow(n)` (which is
+    what `randint()`, `randrange()` and `choice()` use internally).
+
+    CPython uses rejection sampling here: it draws `k = n.bit_length()` random bits
+    and tries again if the result is >= n. Since at least half of all draws are
+    accepted we oversample a bit, pick the first `num` accepted values and then
+    advance the original state by exactly the number of words that were consumed.
+    """
+    if n <= 0:
+        raise ValueError(f"Argument `n` must be positive. Got: n={n}")
+
+    k = n.bit_length()
+    if k > MAX_VECTORIZED_RANDBELOW_BITS:
+        raise ValueError(
+            f"Cannot draw batches of values below n={n} because this requires more than "
+            f"{MAX_VECTORIZED_RANDBELOW_BITS} random bits per value."
+        )
+    words_per_value = 1 if k <= 32 else 2
+
+    if num == 0:
+        return np.empty(0, dtype=np.int64)
+
+    bitgen = _make_bit_generator(randgen)
+    initial_state = bitgen.state
+
+    candidates = []
+    num_accepted = 0
+    while num_accepted < num:
+        num_values_to_draw = int(1.1 * (num - num_accepted) * (1 << k) / n) + 64
+        cur_candidates = _getrandbits_batch(bitgen, k, words_per_value * num_values_to_draw)
+        candidates.append(cur_candidates)
+        num_accepted += np.count_nonzero(cur_candidates < n)
+
+    candidates = np.concatenate(candidates)
+    idx_accepted = np.flatnonzero(candidates < n)[:num]
+    num_values_consumed = int(idx_accepted[-1]) + 1
+
+    # Rewind and advance the state by exactly the number of words consumed.
+    bitgen.state = initial_state
+    bitgen.random_raw(words_per_value * num_values_consumed)
+    _copy_state_from_bit_generator(randgen, bitgen)
+
+    return candidates[idx_accepted]
@@ -0,0 +1,238 @@
+"""
+Helpers for generating items in parallel across a pool of worker processes.
+"""
+
+import os
+
+from collections import deque
+from itertools import islice
+from typing import Iterator, List, Sequence, Tuple
+
+__all__ = [
+    "DEFAULT_SHARD_SIZE",
+    "make_shards",
+    "get_num_workers",
+    "iter_shard_columns",
+    "iter_foreach_task_values",
+    "map_with_generator",
+]
+
+# Default number of items generated per shard if no explicit shard size is given.
+DEFAULT_SHARD_SIZE = 100_000
+
+# Number of chunks of @foreach tasks per worker process (smaller chunks balance the load better
+# if the number of items varies between loop variable combinations, but add overhead).
+NUM_FOREACH_TASK_CHUNKS_PER_WORKER = 4
+
+# Number of tasks per worker process which are submitted to the pool ahead of time. Results are only
+# collected when the caller asks for them, so this bounds how many of them are held in memory at once.
+NUM_PENDING_TASKS_PER_WORKER = 2
+
+# Custom generator used by the current worker process (see `_init_worker()` below).
+_worker_generator = None
+
+
+def make_shards(num: int, shard_size: int, seed_generator) -> List[Tuple[int, int]]:
+    """
+    Split `num` items into shards of size `shard_size` (the last one may be smaller)
+    and return a list of tuples `(shard_seed, shard_num)`, where the shard seeds are
+    produced by the (already reset) `seed_generator`.
+
+    Note that the result depends only on `num`, `shard_size` and the state of
+    `seed_generator`, so that the generated items are independent of how many
+    worker processes are used to produce the shards.
+    """
+    if shard_size <= 0:
+        raise ValueError(f"Shard size must be positive. Got: shard_size={shard_size}")
+
+    shard_sizes = [shard_size] * (num // shard_size)
+    if num % shard_size > 0:
+        shard_sizes.append(num % shard_size)
+
+    return [(next(seed_generator), shard_num) for shard_num in shard_sizes]
+
+
+def get_num_workers(n_jobs: int) -> int:
+    """
+    Return the number of worker processes to use. Negative values of `n_jobs` are
+    interpreted relative to the number of CPUs (`n_jobs=-1` means "use all CPUs").
+    """
+    if n_jobs == 0:
+        raise ValueError("Argument `n_jobs` must not be zero.")
+    if n_jobs < 0:
+        return max(1, os.cpu_count() + 1 + n_jobs)
+    return n_jobs
+
+
+def _get_mp_context():
+    import multiprocessing
+
+    # Where possible we fork the worker processes so that the generator doesn't
+    # need to be transferred to them at all (see `_get_worker_initializer()`).
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    else:  # pragma: no cover
+        return multiprocessing.get_context()
+
+
+def _init_worker(g):
+    global _worker_generator
+    _worker_generator = g
+
+
+def _init_worker_from_snapshot(snapshot):
+    from .snapshots import restore_snapshot
+
+    # The snapshot was created by the parent process, so it is safe to import the module
+    # containing the generator's class (which fresh worker processes haven't done yet).
+    _init_worker(restore_snapshot(snapshot, allow_import=True))
+
+
+def _get_worker_initializer(mp_context, g):
+    """
+    Return the initializer function (and its arguments) which provides each worker process with the generator `g`.
+    """
+    if mp_context.get_start_method() == "fork":
+        # Forked worker processes simply inherit the generator.
+        return _init_worker, (g,)
+    else:
+        # Otherwise we send a snapshot of the generator, since custom generators can contain
+        # lambda functions or dynamically created classes, which often can't be pickled.
+        from .snapshots import make_snapshot
+
+        return _init_worker_from_snapshot, (make_snapshot(g),)
+
+
+def _generate_shard_columns(shard_seed, shard_num):
+    return _worker_generator.generate_columns(shard_num, seed=shard_seed)
+
+
+def _call_with_worker_generator(func, args_chunk):
+    return [func(_worker_generator, *args) for args in args_chunk]
+
+
+def _iter_pool_results(executor, func, args_list, num_workers: int) -> Iterator:
+    """
+    Yield `func(*args)` for each tuple `args` in `args_list`, in order, computed by the given executor.
+
+    Unlike `executor.map()`, which submits all tasks at once, this only keeps a limited number of tasks
+    in flight and submits the next one whenever a result is yielded. This way the results of finished
+    tasks don't pile up in memory if the caller consumes them more slowly than they are produced.
+    """
+    args_iter = iter(args_list)
+    num_pending = NUM_PENDING_TASKS_PER_WORKER * num_workers
+    pending = deque(executor.submit(func, *args) for args in islice(args_iter, num_pending))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for args in islice(args_iter, 1):
+                pending.append(executor.submit(func, *args))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _generate_foreach_task_values(g, combination_idx, seed, num):
+    namespace = g._tohu_namespace
+    namespace.loop_runner.set_current_combination(combination_idx)
+    g.reset(seed)
+    return namespace.generate_value_tuples(num)
+
+
+def iter_shard_columns(g, shards: Sequence[Tuple[int, int]], n_jobs: int = 1) -> Iterator[dict]:
+    """
+    Yield the columns produced by `g.generate_columns()` for each of the given shards, in order.
+
+    Parameters
+    ----------
+    g : CustomGenerator
+        The custom generator used to produce the items.
+    shards : list of (int, int)
+        Shard seeds and sizes, as returned by `make_shards()`.
+    n_jobs : int
+        Number of worker processes to use. If this is 1 the shards
+        are generated in the current process. Otherwise only a few shards
+        per worker are generated ahead of the ones consumed by the caller.
+    """
+    num_workers = get_num_workers(n_jobs)
+
+    if num_workers == 1 or len(shards) <= 1:
+        for shard_seed, shard_num in shards:
+            yield g.generate_columns(shard_num, seed=shard_seed)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        num_workers = min(num_workers, len(shards))
+        mp_context = _get_mp_context()
+        initializer, initargs = _get_worker_initializer(mp_context, g)
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=mp_context,
+            initializer=initializer,
+            initargs=initargs,
+        ) as executor:
+            yield from _iter_pool_results(executor, _generate_shard_columns, shards, num_workers)
+
+
+def map_with_generator(g, func, args_list: Sequence[tuple], n_jobs: int, chunksize: int = 1) -> Iterator:
+    """
+    Yield `func(g, *args)` for each tuple `args` in `args_list`, in order.
+
+    If `n_jobs` is greater than 1 the calls are distributed across a pool of worker processes,
+    each of which has its own copy of `g`. Note that `func` must be picklable (i.e., defined at
+    the top level of a module) and so must its arguments and return values.
+    Only a few chunks of calls per worker are processed ahead of the results consumed by the caller,
+    so that a slow consumer doesn't cause the results of all calls to accumulate in memory.
+
+    Parameters
+    ----------
+    g : CustomGenerator
+        The custom generator passed to `func`.
+    func : callable
+        Function which is called with `g` as its first argument, followed by the elements of `args`.
+    args_list : list of tuples
+        Arguments for each call of `func`.
+    n_jobs : int
+        Number of worker processes to use. If this is 1 all calls happen in the current process.
+    chunksize : int
+        Number of calls which are sent to the worker processes at a time.
+    """
+    num_workers = min(get_num_workers(n_jobs), len(args_list))
+
+    if num_workers <= 1:
+        for args in args_list:
+            yield func(g, *args)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        mp_context = _get_mp_context()
+        initializer, initargs = _get_worker_initializer(mp_context, g)
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=mp_context,
+            initializer=initializer,
+            initargs=initargs,
+        ) as executor:
+            chunks = [(func, args_list[i : i + chunksize]) for i in range(0, len(args_list), chunksize)]
+            for results in _iter_pool_results(executor, _call_with_worker_generator, chunks, num_workers):
+                yield from results
+
+
+def iter_foreach_task_values(g, tasks: Sequence[Tuple[int, int, int]], n_jobs: int) -> Iterator[list]:
+    """
+    Yield the items produced by the custom generator `g` for each of the given @foreach tasks
+    (as lists of tuples of field values), in order.
+
+    Parameters
+    ----------
+    g : CustomGenerator
+        The (@foreach-wrapped) custom generator used to produce the items.
+    tasks : list of (int, int, int)
+        Combination indices, seeds and number of items, as returned by `LoopRunner.make_seeded_tasks()`.
+    n_jobs : int
+        Number of worker processes to use.
+    """
+    num_workers = get_num_workers(n_jobs)
+    chunksize = max(1, len(tasks) // (NUM_FOREACH_TASK_CHUNKS_PER_WORKER * num_workers))
+    yield from map_with_generator(g, _generate_foreach_task_values, tasks, n_jobs=n_jobs, chunksize=chunksize)
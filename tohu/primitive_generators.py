@@ -1,13 +1,43 @@
+import functools
+import hashlib
 import numpy as np
+import json
+import os
 import warnings
-from faker import Faker
-from random import Random
 
 from .base import TohuBaseGenerator
-from .utils import identity
+from .mersenne_twister import MAX_VECTORIZED_RANDBELOW_BITS
+from .checkpoints import CheckpointError
+from .random_backends import (
+    RANDOM_BACKENDS,
+    decode_random_state,
+    encode_random_state,
+    get_default_random_backend,
+    make_random_backend,
+)
+from .utils import identity, make_object_array
 
 __all__ = ["Constant", "Boolean", "Integer", "Float", "HashDigest", "FakerGenerator", "SelectOne"]
 
+INT64_MIN = -(2 ** 63)
+INT64_MAX = 2 ** 63 - 1
+
+
+def infer_dtype(value):
+    """
+    Return the dtype which should be used to represent a column containing copies of `value`.
+    """
+    if isinstance(value, bool):
+        return bool
+    elif isinstance(value, int) and INT64_MIN <= value <= INT64_MAX:
+        return np.int64
+    elif isinstance(value, float):
+        return np.float64
+    elif isinstance(value, str):
+        return str
+    else:
+        return object
+
 
 class Constant(TohuBaseGenerator):
     """
@@ -17,6 +47,7 @@ class Constant(TohuBaseGenerator):
     def __init__(self, value):
         super().__init__()
         self.value = value
+        self.dtype = infer_dtype(value)
 
     def reset(self, seed):
         """
@@ -33,52 +64,186 @@ class Constant(TohuBaseGenerator):
     def __next__(self):
         return self.value
 
+    def generate_batch(self, num):
+        values = np.empty(num, dtype=object)
+        values.fill(self.value)
+        return values
+
+    def _skip(self, num):
+        pass
+
+    def _get_init_kwargs(self):
+        return {"value": self.value}
+
     def spawn(self, gen_mapping=None):
         new_gen = Constant(self.value)
         return new_gen
 
 
-class Boolean(TohuBaseGenerator):
+class _lazy_attribute:
+    """
+    Decorator which turns a method into an attribute that is computed on first access.
+
+    This is similar to `functools.cached_property`, which however isn't available in
+    Python 3.7 and acquires a lock on every uncached access in Python 3.8-3.11. The
+    computed value can be discarded with `del`, so that it is computed again on the next
+    access.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        setattr(instance, self.name, value)
+        return value
+
+
+class RandomPrimitiveGenerator(TohuBaseGenerator):
+    """
+    Base class for primitive generators which draw their random numbers from a random backend.
+
+    To make spawning (and cloning) these generators cheap, the backend (available as `self.rng`)
+    is only created when it is first accessed. Spawned generators only record a snapshot of the
+    random state of the original generator, which is restored when they are first used. Since
+    snapshots are immutable, all generators spawned from the same generator share the same
+    snapshot until the original draws random numbers again, so that the random state only
+    needs to be copied once (or not at all if the original hasn't been used yet).
+    """
+
+    def __init__(self, random_backend=None, *, mt19937_seeding="python"):
+        super().__init__()
+        self._random_backend_name = random_backend or get_default_random_backend()
+        self._mt19937_seeding = mt19937_seeding
+        self._rng_snapshot = None
+        self._rng_is_initialized = False
+        self._idle_rng = None
+
+        # Make sure that invalid backend names are reported immediately (rather than on first use).
+        if self._random_backend_name not in RANDOM_BACKENDS:
+            make_random_backend(self._random_backend_name)
+
+    @_lazy_attribute
+    def rng(self):
+        if self._idle_rng is not None:
+            # The backend was set aside when the last snapshot was taken (see `_get_rng_snapshot()`).
+            rng, self._idle_rng = self._idle_rng, None
+        else:
+            rng = make_random_backend(self._random_backend_name, mt19937_seeding=self._mt19937_seeding)
+            if self._rng_snapshot is not None:
+                self._restore_rng_snapshot(rng, self._rng_snapshot)
+        self._rng_snapshot = None
+        self._rng_is_initialized = True
+        return rng
+
+    def _get_rng_snapshot(self):
+        """
+        Return an (immutable) snapshot of the current random state, which is either of the
+        form `("state", <backend state>)` or `("seed", <seed>)`.
+        """
+        if self._rng_is_initialized and self._rng_snapshot is None:
+            # Every use of the backend goes through `self.rng`, so by setting the backend aside until
+            # it is next accessed we know that the random state hasn't changed as long as the snapshot
+            # is still present. Until then, the same snapshot can be returned without copying the state.
+            self._rng_snapshot = ("state", self.rng.get_state())
+            self._idle_rng = self.rng
+            del self.rng
+        elif self._rng_snapshot is None:
+            # This generator hasn't been used yet, so its initial random state is arbitrary. We fix
+            # it by choosing a random seed, so that spawned generators can share the same state.
+            num_bytes = 4 if self._mt19937_seeding == "numpy" else 16
+            self._rng_snapshot = ("seed", int.from_bytes(os.urandom(num_bytes), "little"))
+        return self._rng_snapshot
+
+    @staticmethod
+    def _restore_rng_snapshot(rng, snapshot):
+        kind, value = snapshot
+        if kind == "seed":
+            rng.reset(value)
+        else:
+            rng.set_state(value)
+
+    def reset(self, seed):
+        super().reset(seed)
+        self.rng.reset(seed)
+        return self
+
+    def _set_rng_snapshot(self, snapshot):
+        if self._rng_is_initialized:
+            self._restore_rng_snapshot(self.rng, snapshot)
+        else:
+            self._rng_snapshot = snapshot
+
+    def _set_state_from(self, other):
+        super()._set_state_from(other)
+        self._set_rng_snapshot(other._get_rng_snapshot())
+
+    def get_state(self):
+        kind, value = self._get_rng_snapshot()
+        if kind == "state":
+            value = encode_random_state(self._random_backend_name, value)
+        return {**super().get_state(), "random_backend": self._random_backend_name, "rng": {kind: value}}
+
+    def set_state(self, state):
+        if state["random_backend"] != self._random_backend_name:
+            raise CheckpointError(
+                f"Cannot restore state of a generator with random backend {state['random_backend']!r} "
+                f"in a generator with random backend {self._random_backend_name!r}: {self}"
+            )
+        super().set_state(state)
+        ((kind, value),) = state["rng"].items()
+        if kind == "state":
+            value = decode_random_state(self._random_backend_name, value)
+        self._set_rng_snapshot((kind, value))
+        return self
+
+
+class Boolean(RandomPrimitiveGenerator):
     """
     Generator which produces random boolean values (True or False) with a given probability.
     """
 
-    def __init__(self, p=0.5):
+    def __init__(self, p=0.5, *, random_backend=None):
         """
         Parameters
         ----------
         p: float
             The probability that True is returned. Must be between 0.0 and 1.0.
+        random_backend: str, optional
+            Name of the random backend to use (see `tohu.random_backends`).
+            If not given, the default backend is used.
         """
-        super().__init__()
+        super().__init__(random_backend)
         self.p = p
-        self.randgen = Random()
         self.dtype = bool
 
-    def reset(self, seed):
-        super().reset(seed)
-        self.randgen.seed(seed)
-        return self
-
     def __next__(self):
-        return self.randgen.random() < self.p
+        return self.rng.random() < self.p
+
+    def generate_batch(self, num):
+        return self.rng.random_batch(num) < self.p
+
+    def _skip(self, num):
+        self.rng.skip_random(num)
+
+    def _get_init_kwargs(self):
+        return {"p": self.p, "random_backend": self._random_backend_name}
 
     def spawn(self, gen_mapping=None):
-        new_gen = Boolean(p=self.p)
+        new_gen = Boolean(p=self.p, random_backend=self._random_backend_name)
         new_gen._set_state_from(self)
         return new_gen
 
-    def _set_state_from(self, other):
-        super()._set_state_from(other)
-        self.randgen.setstate(other.randgen.getstate())
-
 
-class Integer(TohuBaseGenerator):
+class Integer(RandomPrimitiveGenerator):
     """
     Generator which produces random integers k in the range low <= k <= high.
     """
 
-    def __init__(self, low, high):
+    def __init__(self, low, high, *, random_backend=None):
         """
         Parameters
         ----------
@@ -86,36 +251,48 @@ class Integer(TohuBaseGenerator):
             Lower bound (inclusive).
         high: integer or TohuBaseGenerator
             Upper bound (inclusive).
+        random_backend: str, optional
+            Name of the random backend to use (see `tohu.random_backends`).
+            If not given, the default backend is used.
         """
-        super().__init__()
+        super().__init__(random_backend)
         self.low = low
         self.high = high
-        self.randgen = Random()
-
-    def reset(self, seed):
-        super().reset(seed)
-        self.randgen.seed(seed)
-        return self
+        self._width = high - low + 1
+        self.dtype = np.int64 if (INT64_MIN <= low and high <= INT64_MAX) else object
 
     def __next__(self):
-        return self.randgen.randint(self.low, self.high)
+        return self.low + self.rng.randbelow(self._width)
+
+    def generate_batch(self, num):
+        if (
+            self.low < INT64_MIN
+            or self.high > INT64_MAX
+            or self._width.bit_length() > MAX_VECTORIZED_RANDBELOW_BITS
+        ):
+            # The values don't fit into an int64 array, so fall back to producing them one by one.
+            return super().generate_batch(num)
+
+        return self.low + self.rng.randbelow_batch(self._width, num)
+
+    def _skip(self, num):
+        self.rng.skip_randbelow(self._width, num)
+
+    def _get_init_kwargs(self):
+        return {"low": self.low, "high": self.high, "random_backend": self._random_backend_name}
 
     def spawn(self, gen_mapping=None):
-        new_gen = Integer(self.low, self.high)
+        new_gen = Integer(self.low, self.high, random_backend=self._random_backend_name)
         new_gen._set_state_from(self)
         return new_gen
 
-    def _set_state_from(self, other):
-        super()._set_state_from(other)
-        self.randgen.setstate(other.randgen.getstate())
 
-
-class Float(TohuBaseGenerator):
+class Float(RandomPrimitiveGenerator):
     """
     Generator which produces random floating point numbers x in the range low <= x <= high.
     """
 
-    def __init__(self, low: float, high: float, ndigits: int = None):
+    def __init__(self, low: float, high: float, ndigits: int = None, *, random_backend: str = None):
         """
         Parameters
         ----------
@@ -126,38 +303,54 @@ class Float(TohuBaseGenerator):
         ndigits: integer, default None
             Number of digits to which generated numbers should
             be truncated. Default: None (= no truncation).
+        random_backend: str, optional
+            Name of the random backend to use (see `tohu.random_backends`).
+            If not given, the default backend is used.
         """
-        super().__init__()
+        super().__init__(random_backend)
         self.low = low
         self.high = high
-        self.randgen = Random()
         self.ndigits = ndigits
+        self.dtype = np.float64
         self._maybe_truncate = identity if ndigits is None else lambda x: round(x, ndigits)
 
-    def reset(self, seed):
-        super().reset(seed)
-        self.randgen.seed(seed)
-        return self
-
     def __next__(self):
-        return self._maybe_truncate(self.randgen.uniform(self.low, self.high))
+        # Note: this is the same formula as used by `random.Random.uniform()`
+        return self._maybe_truncate(self.low + (self.high - self.low) * self.rng.random())
+
+    def generate_batch(self, num):
+        values = self.low + (self.high - self.low) * self.rng.random_batch(num)
+        if self.ndigits is not None:
+            # We deliberately use Python's built-in round() here rather than np.round()
+            # because the latter can produce slightly different results for some inputs.
+            values = np.array([round(x, self.ndigits) for x in values.tolist()], dtype=np.float64)
+        return values
+
+    def _skip(self, num):
+        self.rng.skip_random(num)
+
+    def _get_init_kwargs(self):
+        return {
+            "low": self.low,
+            "high": self.high,
+            "ndigits": self.ndigits,
+            "random_backend": self._random_backend_name,
+        }
 
     def spawn(self, gen_mapping=None):
-        new_gen = Float(low=self.low, high=self.high, ndigits=self.ndigits)
+        new_gen = Float(
+            low=self.low, high=self.high, ndigits=self.ndigits, random_backend=self._random_backend_name
+        )
         new_gen._set_state_from(self)
         return new_gen
 
-    def _set_state_from(self, other):
-        super()._set_state_from(other)
-        self.randgen.setstate(other.randgen.getstate())
 
-
-class HashDigest(TohuBaseGenerator):
+class HashDigest(RandomPrimitiveGenerator):
     """
     Generator which produces a sequence of hex strings representing hash digest values.
     """
 
-    def __init__(self, *, length, as_bytes=False, lowercase=False):
+    def __init__(self, *, length, as_bytes=False, lowercase=False, random_backend=None):
         """
         Parameters
         ----------
@@ -171,8 +364,13 @@ class HashDigest(TohuBaseGenerator):
         lowercase: bool, optional
             If True, return the hex string using lowercase letters. The default
             uses uppercase letters. This only has an effect if `as_bytes=False`.
+        random_backend: str, optional
+            Name of the random backend to use (see `tohu.random_backends`).
+            If not given, the default backend is used.
         """
-        super().__init__()
+        # Note: for the default "mt19937" backend we use numpy's legacy seeding method
+        # because earlier versions of this class used `numpy.random.RandomState`.
+        super().__init__(random_backend, mt19937_seeding="numpy")
         if not as_bytes and (length % 2) != 0:
             raise ValueError(
                 f"Length must be an even number if as_bytes=False because it "
@@ -189,45 +387,226 @@ class HashDigest(TohuBaseGenerator):
             self._internal_length = length // 2
         self.as_bytes = as_bytes
         self.lowercase = lowercase
-        self.randgen = np.random.RandomState()
         self._maybe_convert_to_hex = identity if self.as_bytes else bytes.hex
         self._maybe_convert_to_uppercase = identity if (self.as_bytes or lowercase) else str.upper
-        self.dtype = str
-
-    def reset(self, seed):
-        super().reset(seed)
-        self.randgen.seed(seed)
-        return self
+        self.dtype = bytes if as_bytes else str
 
     def __next__(self):
-        val = self.randgen.bytes(self._internal_length)
+        val = self.rng.randbytes(self._internal_length)
         return self._maybe_convert_to_uppercase(self._maybe_convert_to_hex(val))
 
+    def generate_batch(self, num):
+        if self.length == 0:
+            return super().generate_batch(num)
+
+        all_bytes = self.rng.randbytes_batch(self._internal_length, num)
+
+        if self.as_bytes:
+            n = self._internal_length
+            return make_object_array(all_bytes[i * n : (i + 1) * n] for i in range(num))
+
+        all_hex_chars = self._maybe_convert_to_uppercase(all_bytes.hex())
+        return np.frombuffer(all_hex_chars.encode("ascii"), dtype=f"S{self.length}").astype(f"U{self.length}")
+
+    def _skip(self, num):
+        self.rng.skip_randbytes(self._internal_length, num)
+
+    def _get_init_kwargs(self):
+        return {
+            "length": self.length,
+            "as_bytes": self.as_bytes,
+            "lowercase": self.lowercase,
+            "random_backend": self._random_backend_name,
+        }
+
     def spawn(self, gen_mapping=None):
-        new_gen = HashDigest(length=self.length, as_bytes=self.as_bytes, lowercase=self.lowercase)
+        new_gen = HashDigest(
+            length=self.length,
+            as_bytes=self.as_bytes,
+            lowercase=self.lowercase,
+            random_backend=self._random_backend_name,
+        )
         new_gen._set_state_from(self)
         return new_gen
 
-    def _set_state_from(self, other):
-        super()._set_state_from(other)
-        self.randgen.set_state(other.randgen.get_state())
+
+def get_shared_faker(locale=None):
+    """
+    Return the faker instance for the given locale which is shared by all `FakerGenerator`s in this process.
+
+    Creating a faker instance loads all providers and locale data, which is relatively expensive both in
+    time and memory. Instead, all faker generators with the same locale use the same instance, and each
+    of them temporarily swaps in its own random source whenever it produces elements.
+
+    Like faker itself, this accepts a single locale, a list of locales or a dict mapping locales to weights.
+    """
+    # Lists and dicts aren't hashable, so we convert them to tuples to look up the cached instance.
+    if isinstance(locale, dict):
+        return _get_shared_faker(tuple(locale.items()), weighted=True)
+    elif isinstance(locale, (list, tuple)):
+        return _get_shared_faker(tuple(locale))
+    else:
+        return _get_shared_faker(locale)
 
 
-class FakerGenerator(TohuBaseGenerator):
+@functools.lru_cache(maxsize=None)
+def _get_shared_faker(locale, weighted=False):
+    # Note: faker is imported here (rather than at the top of this module) because
+    # importing it is relatively slow and many users of tohu don't need it.
+    from faker import Faker
+
+    return Faker(locale=dict(locale) if weighted else locale)
+
+
+def _call_faker_method(fake, method, **faker_args):
+    # With multiple locales, faker picks the locale to use at the time the method is looked up.
+    return getattr(fake, method)(**faker_args)
+
+
+# Faker value pools which have already been created in this process (see `get_faker_pool()`).
+_faker_pools = {}
+
+# Types of values which are unchanged by a round trip through JSON, so that pools consisting
+# only of these can be cached on disk.
+_JSON_POOL_VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+def _is_json_pool(pool):
+    return isinstance(pool, list) and all(type(x) in _JSON_POOL_VALUE_TYPES for x in pool)
+
+
+def get_faker_pool(method, *, locale=None, faker_args=None, pool_size, pool_seed=0, cache_dir=None):
+    """
+    Return a list of up to `pool_size` distinct values produced by the given faker method.
+
+    The pool is generated deterministically from `pool_seed` and cached for the lifetime
+    of the process. If `cache_dir` is given, it is additionally cached on disk so that
+    it doesn't need to be regenerated in subsequent processes. The pool is stored on disk
+    as JSON, so this is only possible if its values are strings, numbers, bools or None
+    (pools of other values are regenerated in each process).
+
+    Parameters
+    ----------
+    method: string
+        Name of the faker provider to use.
+    locale: string, optional
+        Locale to use when generating the values.
+    faker_args: dict, optional
+        Additional arguments passed to the faker provider.
+    pool_size: int
+        Number of distinct values in the pool. If the faker provider can't produce
+        this many distinct values (or only very rarely), the pool will be smaller.
+    pool_seed: int
+        Seed used to generate the values in the pool.
+    cache_dir: str, optional
+        Directory in which to cache the pool on disk.
+    """
+    if not isinstance(pool_size, int) or pool_size <= 0:
+        raise ValueError(f"Pool size must be a positive integer. Got: pool_size={pool_size!r}")
+
+    import faker
+
+    faker_args = faker_args or {}
+    # Note: we include the faker version because the values produced by faker may change between versions.
+    key = repr((faker.VERSION, method, locale, sorted(faker_args.items()), pool_size, pool_seed))
+
+    try:
+        return _faker_pools[key]
+    except KeyError:
+        pass
+
+    filename = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        filename = os.path.join(cache_dir, f"faker_pool_{method}_{digest}.json")
+
+    pool = None
+    if filename is not None and os.path.exists(filename):
+        with open(filename, encoding="utf-8") as f:
+            pool = json.load(f)
+        if not _is_json_pool(pool):
+            warnings.warn(f"Ignoring invalid faker pool cache file: {filename}")
+            pool = None
+
+    if pool is None:
+        pool = _make_faker_pool(method, locale, faker_args, pool_size, pool_seed)
+        if filename is not None and _is_json_pool(pool):
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so that concurrent processes never see a partially written pool.
+            tmp_filename = f"{filename}.{os.getpid()}.tmp"
+            with open(tmp_filename, "w", encoding="utf-8") as f:
+                json.dump(pool, f)
+            os.replace(tmp_filename, filename)
+
+    _faker_pools[key] = pool
+    return pool
+
+
+def _make_faker_pool(method, locale, faker_args, pool_size, pool_seed):
+    g = FakerGenerator(method, locale=locale, **faker_args)
+    g.reset(pool_seed)
+
+    try:
+        pool = {}
+        # Give up after a reasonable number of attempts if the provider only produces few distinct values.
+        for _ in range(10 * pool_size):
+            pool[next(g)] = None
+            if len(pool) == pool_size:
+                break
+        pool = list(pool)
+    except TypeError:
+        # The values aren't hashable, so we can't remove duplicates.
+        g.reset(pool_seed)
+        pool = [next(g) for _ in range(pool_size)]
+
+    if len(pool) < pool_size:
+        warnings.warn(
+            f"Faker method {method!r} only produced {len(pool)} distinct values, "
+            f"so the pool is smaller than the requested size (pool_size={pool_size})."
+        )
+
+    return pool
+
+
+class FakerGenerator(RandomPrimitiveGenerator):
     """
     Generator which produces random elements using one of the methods supported by faker. [1]
 
     [1] https://faker.readthedocs.io/
     """
 
-    def __init__(self, method, *, locale=None, **faker_args):
+    def __init__(
+        self,
+        method,
+        *,
+        locale=None,
+        pool_size=None,
+        pool_seed=0,
+        pool_cache_dir=None,
+        random_backend=None,
+        **faker_args,
+    ):
         """
         Parameters
         ----------
         method: string
             Name of the faker provider to use (see [1] for details)
-        locale: string
-             Locale to use when generating data, e.g. 'en_US' (see [1] for details)
+        locale: string or list of strings
+             Locale to use when generating data, e.g. 'en_US' (see [1] for details). If a list
+             of locales is given, each element is produced using a randomly chosen one of them.
+        pool_size: int, optional
+            If given, a pool of this many distinct values is generated up front (see
+            `get_faker_pool()`) and elements are sampled from this pool, which is much
+            faster than calling the faker provider for every element. The pool itself
+            only depends on `pool_seed`, while the sampled elements depend on the seed
+            passed to `reset()`.
+        pool_seed: int
+            Seed used to generate the pool (only relevant if `pool_size` is given).
+        pool_cache_dir: str, optional
+            Directory in which to cache the pool on disk (only relevant if `pool_size` is given).
+        random_backend: str, optional
+            Name of the random backend to use (see `tohu.random_backends`).
+            If not given, the default backend is used.
         faker_args:
             Remaining arguments passed to the faker provider (see [1] for details)
 
@@ -235,67 +614,251 @@ class FakerGenerator(TohuBaseGenerator):
         ----------
         [1] https://faker.readthedocs.io/
         """
-        super().__init__()
+        super().__init__(random_backend)
         self.method = method
         self.locale = locale
         self.faker_args = faker_args
 
-        self.fake = Faker(locale=locale)
-        self.randgen = getattr(self.fake, method)
-        self.fake.seed_instance(None)  # seed instance to ensure we are decoupled from the global random state
+        self.fake = get_shared_faker(locale)
 
-    def reset(self, seed):
-        super().reset(seed)
-        self.fake.seed_instance(seed)
-        return self
+        # The shared faker instance delegates all calls to one underlying faker generator per locale.
+        # We replace the random source of all of them with our own before producing any elements (in
+        # multiple locale mode this also determines which locale is used for each element).
+        self._faker_factories = tuple(self.fake.factories)
+        if len(self._faker_factories) == 1:
+            self.randgen = getattr(self._faker_factories[0], method)
+        else:
+            getattr(self.fake, method)  # make sure the method exists
+            self.randgen = functools.partial(_call_faker_method, self.fake, method)
+
+        self.pool_size = pool_size
+        self.pool_seed = pool_seed
+        self.pool_cache_dir = pool_cache_dir
+        if pool_size is None:
+            self._pool = None
+        else:
+            self._pool = get_faker_pool(
+                method,
+                locale=locale,
+                faker_args=faker_args,
+                pool_size=pool_size,
+                pool_seed=pool_seed,
+                cache_dir=pool_cache_dir,
+            )
+            self._pool_array = make_object_array(self._pool)
+
+    @_lazy_attribute
+    def _python_random(self):
+        # Let faker draw its random numbers from our own backend (this also ensures
+        # that we are decoupled from the global random state).
+        return self.rng.as_python_random()
+
+    def _use_own_random_source(self):
+        # Faker draws from our backend via `self._python_random`, so we access `self.rng` to make
+        # sure that any snapshot of the random state is discarded (see `_get_rng_snapshot()`).
+        self.rng
+        python_random = self._python_random
+        for factory in self._faker_factories:
+            factory.random = python_random
 
     def __next__(self):
+        if self._pool is not None:
+            return self._pool[self.rng.randbelow(len(self._pool))]
+        self._use_own_random_source()
         return self.randgen(**self.faker_args)
 
+    def generate_batch(self, num):
+        if self._pool is not None:
+            return self._pool_array[self.rng.randbelow_batch(len(self._pool), num)]
+        self._use_own_random_source()
+        randgen = self.randgen
+        faker_args = self.faker_args
+        return make_object_array(randgen(**faker_args) for _ in range(num))
+
+    def _skip(self, num):
+        if self._pool is not None:
+            self.rng.skip_randbelow(len(self._pool), num)
+        else:
+            super()._skip(num)
+
+    def _get_init_kwargs(self):
+        return {
+            "method": self.method,
+            "locale": self.locale,
+            "pool_size": self.pool_size,
+            "pool_seed": self.pool_seed,
+            "pool_cache_dir": self.pool_cache_dir,
+            "random_backend": self._random_backend_name,
+            **self.faker_args,
+        }
+
     def spawn(self, gen_mapping=None):
-        new_gen = FakerGenerator(method=self.method, locale=self.locale, **self.faker_args)
+        new_gen = FakerGenerator(
+            method=self.method,
+            locale=self.locale,
+            pool_size=self.pool_size,
+            pool_seed=self.pool_seed,
+            pool_cache_dir=self.pool_cache_dir,
+            random_backend=self._random_backend_name,
+            **self.faker_args,
+        )
         new_gen._set_state_from(self)
         return new_gen
 
-    def _set_state_from(self, other):
-        super()._set_state_from(other)
-        self.fake.random.setstate(other.fake.random.getstate())
 
+def make_alias_table(weights):
+    """
+    Return the tables used to sample indices according to the given weights via Walker's alias method.
+
+    The result is a tuple `(prob, alias)` of arrays of the same length `n` as `weights`. To sample an
+    index, pick a column `i` uniformly at random and return `i` with probability `prob[i]`, otherwise
+    return `alias[i]`. The tables are constructed in O(n) time using Vose's algorithm.
 
-class SelectOne(TohuBaseGenerator):
+    Parameters
+    ----------
+    weights: sequence of float
+        Non-negative (not necessarily normalised) weights. At least one of them must be positive.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 1 or len(weights) == 0:
+        raise ValueError("Weights must be a non-empty one-dimensional sequence.")
+    if not np.all(np.isfinite(weights)) or np.any(weights < 0):
+        raise ValueError("Weights must be finite and non-negative.")
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("At least one weight must be positive.")
+
+    n = len(weights)
+    scaled = (weights * (n / total)).tolist()
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, x in enumerate(scaled) if x < 1.0]
+    large = [i for i, x in enumerate(scaled) if x >= 1.0]
+
+    while small and large:
+        i = small.pop()
+        j = large.pop()
+        prob[i] = scaled[i]
+        alias[i] = j
+        scaled[j] = (scaled[j] + scaled[i]) - 1.0
+        (small if scaled[j] < 1.0 else large).append(j)
+
+    # Any remaining columns (which only arise from rounding errors) are never redirected,
+    # which is what their default entries in `prob` and `alias` already ensure.
+    return np.array(prob, dtype=np.float64), np.array(alias, dtype=np.int64)
+
+
+class SelectOne(RandomPrimitiveGenerator):
     """
     Generator which produces random elements chosen from a fixed sequence of items.
     """
 
-    def __init__(self, items):
-        super().__init__()
-        self.items = list(items)  #  TOOD: for efficiency, only do this if items is a generator?
-        self.randgen = Random()
+    def __init__(self, items, *, p=None, random_backend=None):
+        """
+        Parameters
+        ----------
+        items: sequence
+            The items from which elements are chosen.
+        p: sequence of float, optional
+            The probabilities (or, more generally, non-negative weights) associated with each
+            of the items. If not given, all items are chosen with the same probability.
+        random_backend: str, optional
+            Name of the random backend to use (see `tohu.random_backends`).
+            If not given, the default backend is used.
+        """
+        super().__init__(random_backend)
+        # Note: spawned generators share the items (and alias tables) with
+        # the original generator instead of copying them (see `spawn()`).
+        self.items = list(items)
+        self.p = p
+        self._items_array = make_object_array(self.items)
 
-    def reset(self, seed):
-        super().reset(seed)
-        self.randgen.seed(seed)
+        if p is None:
+            self._alias_prob = self._alias_idx = None
+        else:
+            if len(p) != len(self.items):
+                raise ValueError(
+                    f"Number of probabilities must be the same as the number of items. "
+                    f"Got: len(p)={len(p)}, len(items)={len(self.items)}"
+                )
+            self._alias_prob, self._alias_idx = make_alias_table(p)
+            # Plain lists are faster to index with individual integers than numpy arrays.
+            self._alias_prob_list = self._alias_prob.tolist()
+            self._alias_idx_list = self._alias_idx.tolist()
+
+        self.dtype = "category"
 
     def __next__(self):
-        return self.randgen.choice(self.items)
+        if self._alias_prob is None:
+            return self.items[self.rng.randbelow(len(self.items))]
+
+        # We use a single uniform random number per element: its integer part selects
+        # the column of the alias table and its fractional part decides between the
+        # column itself and its alias.
+        x = self.rng.random() * len(self.items)
+        i = int(x)
+        return self.items[i if x - i < self._alias_prob_list[i] else self._alias_idx_list[i]]
+
+    def generate_index_batch(self, num):
+        """
+        Return an int64 array of the indices (into `self.items`) of the next `num` elements.
+        """
+        if self._alias_prob is None:
+            return self.rng.randbelow_batch(len(self.items), num)
+
+        x = self.rng.random_batch(num) * len(self.items)
+        i = x.astype(np.int64)
+        return np.where(x - i < self._alias_prob[i], i, self._alias_idx[i])
+
+    def generate_batch(self, num):
+        return self._items_array[self.generate_index_batch(num)]
+
+    def _skip(self, num):
+        if self._alias_prob is None:
+            self.rng.skip_randbelow(len(self.items), num)
+        else:
+            self.rng.skip_random(num)
+
+    def _get_init_kwargs(self):
+        return {"items": self.items, "p": self.p, "random_backend": self._random_backend_name}
 
     def spawn(self, gen_mapping=None):
-        new_gen = SelectOne(self.items)
+        # Bypass `__init__()` so that the (potentially very large) items
+        # and alias tables are shared with this generator, not copied.
+        new_gen = SelectOne.__new__(SelectOne)
+        RandomPrimitiveGenerator.__init__(new_gen, self._random_backend_name)
+        new_gen.items = self.items
+        new_gen.p = self.p
+        new_gen._items_array = self._items_array
+        new_gen._alias_prob = self._alias_prob
+        new_gen._alias_idx = self._alias_idx
+        if self._alias_prob is not None:
+            new_gen._alias_prob_list = self._alias_prob_list
+            new_gen._alias_idx_list = self._alias_idx_list
+        new_gen.dtype = self.dtype
         new_gen._set_state_from(self)
         return new_gen
 
-    def _set_state_from(self, other):
-        super()._set_state_from(other)
-        self.randgen.setstate(other.randgen.getstate())
-
-
-# PRIMITIVE_GENERATORS = [Constant, Boolean, Integer, Float, HashDigest, FakerGenerator, SelectOne]
-EXEMPLAR_PRIMITIVE_GENERATORS = [
-    Constant("quux"),
-    Boolean(p=0.3),
-    Integer(low=100, high=200),
-    Float(low=2.0, high=5.0, ndigits=3),
-    HashDigest(length=6),
-    FakerGenerator(method="name"),
-    SelectOne(["aa", "bb", "cc", "dd"]),
-]
+
+PRIMITIVE_GENERATORS = [Constant, Boolean, Integer, Float, HashDigest, FakerGenerator, SelectOne]
+
+
+def _make_exemplar_primitive_generators():
+    return [
+        Constant("quux"),
+        Boolean(p=0.3),
+        Integer(low=100, high=200),
+        Float(low=2.0, high=5.0, ndigits=3),
+        HashDigest(length=6),
+        FakerGenerator(method="name"),
+        SelectOne(["aa", "bb", "cc", "dd"]),
+    ]
+
+
+def __getattr__(name):
+    # The exemplar generators are only created on first access (see PEP 562) so
+    # that importing this module doesn't require creating a faker instance.
+    if name == "EXEMPLAR_PRIMITIVE_GENERATORS":
+        value = globals()[name] = _make_exemplar_primitive_generators()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,436 @@
+"""
+Random number generator backends which can be used by tohu's primitive generators.
+
+Each primitive generator holds an instance of one of the backend classes below and
+draws all its random numbers through the small interface they provide (floats in
+[0, 1), integers below a bound and raw bytes, both individually and in batches).
+
+The following backends are available:
+
+  - "mt19937": Python's built-in Mersenne Twister (`random.Random`). This is the
+    default and produces the same sequences as earlier versions of tohu.
+  - "pcg64", "philox", "sfc64": The corresponding bit generators from numpy. These
+    draw a fixed number of 64-bit words per element (except for integers below a
+    bound which isn't a power of two, see `NumpyBitGeneratorBackend`), which means
+    that skipping elements is cheap (and takes constant time for "pcg64" and "philox").
+"""
+
+import hashlib
+import numpy as np
+
+from random import Random
+
+from .mersenne_twister import (
+    random_batch as mt_random_batch,
+    randbelow_batch as mt_randbelow_batch,
+    randbytes_batch as mt_randbytes_batch,
+    skip_words as mt_skip_words,
+    MAX_VECTORIZED_RANDBELOW_BITS,
+)
+
+__all__ = [
+    "MersenneTwisterBackend",
+    "NumpyBitGeneratorBackend",
+    "RANDOM_BACKENDS",
+    "make_random_backend",
+    "get_default_random_backend",
+    "set_default_random_backend",
+    "encode_random_state",
+    "decode_random_state",
+]
+
+# Maximum number of elements drawn at once when skipping elements without a cheap jump-ahead.
+SKIP_CHUNK_SIZE = 2 ** 20
+
+# Batches of fewer elements than this are drawn one by one by the "mt19937" backend, because handing
+# its state over to numpy and back (see `tohu.mersenne_twister`) has a fixed cost of a few hundred
+# microseconds, which is only worth it for large enough batches.
+MIN_MT19937_VECTORIZED_BATCH_SIZE = 1024
+
+
+class MersenneTwisterBackend:
+    """
+    Backend based on Python's built-in `random.Random`.
+
+    Batches of random numbers are drawn via numpy's MT19937 bit generator in a
+    way which guarantees identical results to repeated scalar draws.
+    """
+
+    name = "mt19937"
+
+    def __init__(self, *, seeding="python"):
+        """
+        Parameters
+        ----------
+        seeding : str
+            Either "python" (seed the generator like `random.Random.seed()`) or "numpy"
+            (seed it like the legacy `numpy.random.RandomState.seed()` does). The latter
+            only exists so that `HashDigest` keeps producing the same values as before.
+        """
+        if seeding not in ("python", "numpy"):
+            raise ValueError(f"Invalid seeding method: {seeding!r}. Must be one of: 'python', 'numpy'")
+        self.seeding = seeding
+        self.randgen = Random()
+
+    def reset(self, seed):
+        if self.seeding == "python":
+            self.randgen.seed(seed)
+        else:
+            _, key, pos, _, _ = np.random.RandomState(seed).get_state()
+            self.randgen.setstate((3, tuple(key.tolist()) + (pos,), None))
+
+    def spawn(self):
+        return MersenneTwisterBackend(seeding=self.seeding)
+
+    def get_state(self):
+        return self.randgen.getstate()
+
+    def set_state(self, state):
+        self.randgen.setstate(state)
+
+    def as_python_random(self):
+        return self.randgen
+
+    def random(self):
+        return self.randgen.random()
+
+    def random_batch(self, num):
+        if num < MIN_MT19937_VECTORIZED_BATCH_SIZE:
+            random = self.randgen.random
+            return np.array([random() for _ in range(num)], dtype=np.float64)
+        return mt_random_batch(self.randgen, num)
+
+    def skip_random(self, num):
+        # Each call to `random()` consumes two 32-bit words
+        mt_skip_words(self.randgen, 2 * num)
+
+    def randbelow(self, n):
+        return self.randgen.randrange(n)
+
+    def randbelow_batch(self, n, num):
+        if num < MIN_MT19937_VECTORIZED_BATCH_SIZE and 0 < n and n.bit_length() <= MAX_VECTORIZED_RANDBELOW_BITS:
+            randrange = self.randgen.randrange
+            return np.array([randrange(n) for _ in range(num)], dtype=np.int64)
+        return mt_randbelow_batch(self.randgen, n, num)
+
+    def skip_randbelow(self, n, num):
+        if n.bit_length() > MAX_VECTORIZED_RANDBELOW_BITS:
+            for _ in range(num):
+                self.randgen.randrange(n)
+        else:
+            num_remaining = num
+            while num_remaining > 0:
+                cur_chunk_size = min(SKIP_CHUNK_SIZE, num_remaining)
+                mt_randbelow_batch(self.randgen, n, cur_chunk_size)
+                num_remaining -= cur_chunk_size
+
+    def randbytes(self, length):
+        # Like `RandomState.bytes()` this consumes a whole number of 32-bit
+        # words (interpreted as little-endian) and discards surplus bytes.
+        if length == 0:
+            return b""
+        num_words = (length - 1) // 4 + 1
+        return self.randgen.getrandbits(32 * num_words).to_bytes(4 * num_words, "little")[:length]
+
+    def randbytes_batch(self, length, num):
+        if num < MIN_MT19937_VECTORIZED_BATCH_SIZE:
+            return b"".join([self.randbytes(length) for _ in range(num)])
+        return mt_randbytes_batch(self.randgen, length, num)
+
+    def skip_randbytes(self, length, num):
+        mt_skip_words(self.randgen, num * ((length + 3) // 4))
+
+
+def _seed_to_int(seed):
+    """
+    Convert `seed` to a non-negative integer that can be used to seed a numpy bit generator.
+    Similar to `random.Random.seed()`, this also accepts strings and negative integers.
+    """
+    if seed is None or isinstance(seed, int) and seed >= 0:
+        return seed
+    elif isinstance(seed, int):
+        return -seed
+    else:
+        return int.from_bytes(hashlib.sha512(str(seed).encode()).digest(), "big")
+
+
+def _mulhi64(a, b):
+    """
+    Return the upper 64 bits of the 128-bit products of the uint64 arrays `a` and `b`
+    (i.e. `(a * b) >> 64`, computed exactly without overflow).
+    """
+    mask = np.uint64(0xFFFFFFFF)
+    shift = np.uint64(32)
+    a_hi, a_lo = a >> shift, a & mask
+    b_hi, b_lo = b >> shift, b & mask
+    lo_lo = a_lo * b_lo
+    hi_lo = a_hi * b_lo
+    lo_hi = a_lo * b_hi
+    carry = ((hi_lo & mask) + (lo_hi & mask) + (lo_lo >> shift)) >> shift
+    return a_hi * b_hi + (hi_lo >> shift) + (lo_hi >> shift) + carry
+
+
+class NumpyBitGeneratorBackend:
+    """
+    Backend based on one of numpy's bit generators (e.g. `numpy.random.PCG64`).
+
+    Most elements are derived from a fixed number of raw 64-bit words, so that
+    batches of elements can be produced with a single call to the bit generator
+    and skipping elements only requires advancing the bit generator's state.
+    The exception are integers below a bound which is not a power of two: these
+    occasionally need to reject a word in order to stay unbiased, so skipping
+    them requires drawing the values.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.bit_generator_cls = NUMPY_BIT_GENERATORS[name]
+        self.bit_generator = self.bit_generator_cls()
+
+    def reset(self, seed):
+        self.bit_generator = self.bit_generator_cls(_seed_to_int(seed))
+
+    def spawn(self):
+        return NumpyBitGeneratorBackend(self.name)
+
+    def get_state(self):
+        return self.bit_generator.state
+
+    def set_state(self, state):
+        self.bit_generator.state = state
+
+    def as_python_random(self):
+        return BitGeneratorRandom(self)
+
+    def _advance(self, num_words):
+        """
+        Advance the bit generator by `num_words` 64-bit words.
+        """
+        bitgen = self.bit_generator
+        if isinstance(bitgen, np.random.PCG64):
+            bitgen.advance(num_words)
+        elif isinstance(bitgen, np.random.Philox):
+            # Philox produces blocks of four words at a time and `advance()`
+            # skips whole blocks, so we need to deal with the partial blocks
+            # at the beginning and the end separately.
+            num_words_left_in_buffer = 4 - int(bitgen.state["buffer_pos"])
+            if num_words <= num_words_left_in_buffer:
+                bitgen.random_raw(num_words)
+            else:
+                bitgen.random_raw(num_words_left_in_buffer)
+                num_words -= num_words_left_in_buffer
+                bitgen.advance(num_words // 4)
+                bitgen.random_raw(num_words % 4)
+        else:
+            num_remaining = num_words
+            while num_remaining > 0:
+                cur_chunk_size = min(SKIP_CHUNK_SIZE, num_remaining)
+                bitgen.random_raw(cur_chunk_size)
+                num_remaining -= cur_chunk_size
+
+    def random(self):
+        return (self.bit_generator.random_raw() >> 11) * (1.0 / 9007199254740992.0)
+
+    def random_batch(self, num):
+        return (self.bit_generator.random_raw(num) >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+    def skip_random(self, num):
+        self._advance(num)
+
+    @staticmethod
+    def _num_words_for_randbelow(n):
+        # A random integer w consisting of one or more 64-bit words is mapped to (w * n) >> (64 * num_words),
+        # rejecting the few values of w which would otherwise make the result biased (Lemire's method). For
+        # bounds larger than 2**64 we need to combine several words.
+        return 1 if n <= 2 ** 64 else (n.bit_length() + 63) // 64 + 1
+
+    def randbelow(self, n):
+        num_words = self._num_words_for_randbelow(n)
+        num_bits = 64 * num_words
+        mask = (1 << num_bits) - 1
+        threshold = ((1 << num_bits) - n) % n
+        while True:
+            if num_words == 1:
+                w = self.bit_generator.random_raw()
+            else:
+                words = self.bit_generator.random_raw(num_words).tolist()
+                w = sum(x << (64 * i) for i, x in enumerate(words))
+            m = w * n
+            if (m & mask) >= threshold:
+                return m >> num_bits
+
+    def randbelow_batch(self, n, num):
+        if n <= 0 or n.bit_length() > MAX_VECTORIZED_RANDBELOW_BITS:
+            raise ValueError(f"Cannot draw batches of values below n={n}")
+        n_uint64 = np.uint64(n)
+        threshold = np.uint64((2 ** 64 - n) % n)
+        result = np.empty(num, dtype=np.int64)
+        num_done = 0
+        while num_done < num:
+            # Every word yields at most one value, so drawing exactly as many words as there are
+            # values missing consumes the same words (in the same order) as repeated calls to
+            # `randbelow()` would.
+            words = self.bit_generator.random_raw(num - num_done)
+            accepted = words * n_uint64 >= threshold
+            values = _mulhi64(words[accepted], n_uint64)
+            result[num_done : num_done + len(values)] = values
+            num_done += len(values)
+        return result
+
+    def skip_randbelow(self, n, num):
+        num_words = self._num_words_for_randbelow(n)
+        if (1 << (64 * num_words)) % n == 0:
+            # No words are ever rejected (n is a power of two), so we know exactly how many to skip.
+            self._advance(num * num_words)
+        elif 0 < n and n.bit_length() <= MAX_VECTORIZED_RANDBELOW_BITS:
+            num_remaining = num
+            while num_remaining > 0:
+                cur_chunk_size = min(SKIP_CHUNK_SIZE, num_remaining)
+                self.randbelow_batch(n, cur_chunk_size)
+                num_remaining -= cur_chunk_size
+        else:
+            for _ in range(num):
+                self.randbelow(n)
+
+    def randbytes(self, length):
+        num_words = (length + 7) // 8
+        return self.bit_generator.random_raw(num_words).astype("<u8").tobytes()[:length]
+
+    def randbytes_batch(self, length, num):
+        num_words = (length + 7) // 8
+        words = self.bit_generator.random_raw(num * num_words).astype("<u8")
+        return words.view(np.uint8).reshape(num, 8 * num_words)[:, :length].tobytes()
+
+    def skip_randbytes(self, length, num):
+        self._advance(num * ((length + 7) // 8))
+
+
+class BitGeneratorRandom(Random):
+    """
+    Drop-in replacement for `random.Random` which draws its random numbers from
+    a `NumpyBitGeneratorBackend`. This allows to use these backends with third-party
+    code which expects a `random.Random` instance (such as faker).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        super().__init__()
+
+    def seed(self, a=None, version=2):
+        # This is called by `Random.__init__()`, but the state is managed by the backend.
+        if a is not None:
+            self.backend.reset(a)
+
+    def getstate(self):
+        return self.backend.get_state()
+
+    def setstate(self, state):
+        self.backend.set_state(state)
+
+    def random(self):
+        return self.backend.random()
+
+    def getrandbits(self, k):
+        num_words = (k + 63) // 64
+        words = self.backend.bit_generator.random_raw(num_words).tolist()
+        return sum(x << (64 * i) for i, x in enumerate(words)) >> (64 * num_words - k)
+
+
+NUMPY_BIT_GENERATORS = {"pcg64": np.random.PCG64, "philox": np.random.Philox, "sfc64": np.random.SFC64}
+RANDOM_BACKENDS = ["mt19937"] + list(NUMPY_BIT_GENERATORS.keys())
+
+_default_random_backend = "mt19937"
+
+
+def get_default_random_backend():
+    """
+    Return the name of the random backend used by generators which don't specify one explicitly.
+    """
+    return _default_random_backend
+
+
+def set_default_random_backend(name):
+    """
+    Set the random backend used by all subsequently created generators which don't specify one explicitly.
+
+    Parameters
+    ----------
+    name : str
+        One of "mt19937" (the default), "pcg64", "philox", "sfc64".
+    """
+    global _default_random_backend
+    if name not in RANDOM_BACKENDS:
+        raise ValueError(f"Invalid random backend: {name!r}. Must be one of: {', '.join(RANDOM_BACKENDS)}")
+    _default_random_backend = name
+
+
+def make_random_backend(name=None, *, mt19937_seeding="python"):
+    """
+    Create a new random backend instance.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the backend (see `RANDOM_BACKENDS`). If not given,
+        the default backend (see `set_default_random_backend()`) is used.
+    mt19937_seeding : str
+        Seeding method to use if this is a "mt19937" backend (see `MersenneTwisterBackend`).
+    """
+    name = name or _default_random_backend
+    if name == "mt19937":
+        return MersenneTwisterBackend(seeding=mt19937_seeding)
+    elif name in NUMPY_BIT_GENERATORS:
+        return NumpyBitGeneratorBackend(name)
+    else:
+        raise ValueError(f"Invalid random backend: {name!r}. Must be one of: {', '.join(RANDOM_BACKENDS)}")
+
+
+def encode_random_state(name, state):
+    """
+    Convert the state of a random backend (as returned by its `get_state()` method)
+    into plain Python types (dicts, lists, ints, floats), so that it can be stored
+    as JSON. The inverse of this is `decode_random_state()`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the random backend which produced the state (see `RANDOM_BACKENDS`).
+    state : object
+        State returned by the backend's `get_state()` method.
+    """
+    if name == "mt19937":
+        version, internal_state, gauss_next = state
+        return {
+            "version": version,
+            "key": list(internal_state[:624]),
+            "pos": internal_state[624],
+            "gauss_next": gauss_next,
+        }
+    elif name in NUMPY_BIT_GENERATORS:
+        return _convert_arrays_to_lists(state)
+    else:
+        raise ValueError(f"Invalid random backend: {name!r}. Must be one of: {', '.join(RANDOM_BACKENDS)}")
+
+
+def decode_random_state(name, encoded_state):
+    """
+    Return the state of a random backend from its encoded form (see `encode_random_state()`),
+    which can be passed to the backend's `set_state()` method.
+    """
+    if name == "mt19937":
+        internal_state = tuple(encoded_state["key"]) + (encoded_state["pos"],)
+        return (encoded_state["version"], internal_state, encoded_state["gauss_next"])
+    elif name in NUMPY_BIT_GENERATORS:
+        # Note: numpy's bit generators accept lists in place of the arrays in their state.
+        return encoded_state
+    else:
+        raise ValueError(f"Invalid random backend: {name!r}. Must be one of: {', '.join(RANDOM_BACKENDS)}")
+
+
+def _convert_arrays_to_lists(x):
+    if isinstance(x, dict):
+        return {key: _convert_arrays_to_lists(value) for key, value in x.items()}
+    elif isinstance(x, np.ndarray):
+        return x.tolist()
+    else:
+        return x
@@ -0,0 +1,325 @@
+"""
+Compact binary snapshots of generators, which can be used to rebuild a generator (including its
+current state) in a different process without pickling it.
+
+A snapshot is a byte string consisting of a short header (which identifies the format and its
+version) followed by the encoded *schema* of the generator (what kind of generator it is and the
+arguments it was created with) and its *state* (as returned by `get_state()`). The encoding only
+supports plain Python types (None, bools, ints, floats, strings, bytes, lists, tuples and dicts),
+so that decoding a snapshot never executes arbitrary code. Lists of non-negative integers (such as
+the internal state of a Mersenne Twister) are stored as packed arrays of 32-bit or 64-bit words.
+
+Primitive generators can be rebuilt from their class name and arguments. Custom generators are
+rebuilt by looking up their class (which therefore needs to be defined at the top level of a module)
+and calling it with the same arguments as the original, so the functions used in `Apply` generators
+never need to be serialized. Note that this runs the custom generator's `__init__()`, and that by
+default the class is only looked up in modules which have already been imported (importing a module
+executes its code, so `restore_snapshot()` only does this if explicitly allowed to).
+"""
+
+import importlib
+import struct
+import sys
+import numpy as np
+
+__all__ = ["SNAPSHOT_FORMAT_VERSION", "SnapshotError", "make_snapshot", "restore_snapshot"]
+
+SNAPSHOT_MAGIC = b"TOHUSNAP"
+
+# This needs to be increased whenever the snapshot format changes in an incompatible way.
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Lists of non-negative integers with at least this many elements are stored as packed arrays.
+MIN_PACKED_ARRAY_LENGTH = 8
+
+
+class SnapshotError(Exception):
+    """
+    Custom exception to indicate that a generator cannot be snapshotted or that a snapshot is invalid.
+    """
+
+
+def _encode_varint(n, out):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_packed_array_typecode(values):
+    if len(values) < MIN_PACKED_ARRAY_LENGTH or not all(type(x) is int and x >= 0 for x in values):
+        return None
+    maxval = max(values)
+    if maxval < 2 ** 32:
+        return "I"
+    elif maxval < 2 ** 64:
+        return "Q"
+    return None
+
+
+def _encode_value(x, out):
+    if x is None:
+        out += b"N"
+    elif x is True:
+        out += b"T"
+    elif x is False:
+        out += b"F"
+    elif isinstance(x, np.bool_):
+        out += b"T" if x else b"F"
+    elif isinstance(x, (int, np.integer)):
+        x = int(x)
+        num_bytes = (x.bit_length() + 8) // 8  # including the sign bit
+        out += b"i"
+        _encode_varint(num_bytes, out)
+        out += x.to_bytes(num_bytes, "little", signed=True)
+    elif isinstance(x, (float, np.floating)):
+        out += b"f" + struct.pack("<d", x)
+    elif isinstance(x, str):
+        data = x.encode("utf-8")
+        out += b"s"
+        _encode_varint(len(data), out)
+        out += data
+    elif isinstance(x, bytes):
+        out += b"b"
+        _encode_varint(len(x), out)
+        out += x
+    elif isinstance(x, (list, tuple, np.ndarray)):
+        values = x.tolist() if isinstance(x, np.ndarray) else x
+        typecode = _get_packed_array_typecode(values)
+        if typecode is not None and isinstance(x, list):
+            out += b"a" + typecode.encode("ascii")
+            _encode_varint(len(values), out)
+            out += np.array(values, dtype=f"<u{struct.calcsize(typecode)}").tobytes()
+        else:
+            out += b"t" if isinstance(x, tuple) else b"l"
+            _encode_varint(len(values), out)
+            for value in values:
+                _encode_value(value, out)
+    elif isinstance(x, dict):
+        out += b"d"
+        _encode_varint(len(x), out)
+        for key, value in x.items():
+            _encode_value(key, out)
+            _encode_value(value, out)
+    else:
+        raise SnapshotError(f"Cannot encode value of type {type(x).__name__} in snapshot: {x!r}")
+
+
+class _Decoder:
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def read(self, num_bytes):
+        if self.pos + num_bytes > len(self.data):
+            raise SnapshotError("Snapshot is truncated.")
+        result = self.data[self.pos : self.pos + num_bytes]
+        self.pos += num_bytes
+        return result
+
+    def read_varint(self):
+        n = 0
+        shift = 0
+        while True:
+            (b,) = self.read(1)
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def read_value(self):
+        tag = bytes(self.read(1))
+        if tag == b"N":
+            return None
+        elif tag == b"T":
+            return True
+        elif tag == b"F":
+            return False
+        elif tag == b"i":
+            return int.from_bytes(self.read(self.read_varint()), "little", signed=True)
+        elif tag == b"f":
+            (x,) = struct.unpack("<d", self.read(8))
+            return x
+        elif tag == b"s":
+            return str(self.read(self.read_varint()), "utf-8")
+        elif tag == b"b":
+            return bytes(self.read(self.read_varint()))
+        elif tag == b"a":
+            typecode = str(self.read(1), "ascii")
+            if typecode not in ("I", "Q"):
+                raise SnapshotError(f"Invalid array type in snapshot: {typecode!r}")
+            num_bytes_per_value = struct.calcsize(typecode)
+            num_values = self.read_varint()
+            data = self.read(num_values * num_bytes_per_value)
+            return np.frombuffer(data, dtype=f"<u{num_bytes_per_value}").tolist()
+        elif tag in (b"l", b"t"):
+            values = [self.read_value() for _ in range(self.read_varint())]
+            return tuple(values) if tag == b"t" else values
+        elif tag == b"d":
+            result = {}
+            for _ in range(self.read_varint()):
+                key = self.read_value()
+                result[key] = self.read_value()
+            return result
+        else:
+            raise SnapshotError(f"Invalid value tag in snapshot: {tag!r}")
+
+
+def encode_snapshot(schema, state):
+    """
+    Return a snapshot (a byte string) containing the given schema and state.
+    """
+    out = bytearray(SNAPSHOT_MAGIC)
+    out += struct.pack("<H", SNAPSHOT_FORMAT_VERSION)
+    _encode_value({"schema": schema, "state": state}, out)
+    return bytes(out)
+
+
+def decode_snapshot(data):
+    """
+    Return the schema and state contained in a snapshot created by `encode_snapshot()`.
+    """
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise SnapshotError("Data is not a tohu snapshot.")
+
+    decoder = _Decoder(memoryview(data), pos=len(SNAPSHOT_MAGIC))
+    (format_version,) = struct.unpack("<H", decoder.read(2))
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot format version: {format_version} (expected: {SNAPSHOT_FORMAT_VERSION})"
+        )
+
+    try:
+        contents = decoder.read_value()
+    except (TypeError, UnicodeDecodeError):
+        # E.g. a dict with an unhashable key or a string which isn't valid UTF-8.
+        raise SnapshotError("Invalid value in snapshot.")
+    if decoder.pos != len(data):
+        raise SnapshotError("Snapshot contains unexpected trailing data.")
+    if not (isinstance(contents, dict) and contents.keys() == {"schema", "state"}):
+        raise SnapshotError("Invalid snapshot contents.")
+    return contents["schema"], contents["state"]
+
+
+def _get_import_path(cls):
+    if "<locals>" in cls.__qualname__:
+        raise SnapshotError(
+            f"Cannot create snapshot of generator because its class is not defined at the top level "
+            f"of a module: {cls.__qualname__}"
+        )
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _import_from_path(path, *, allow_import):
+    module_name, qualname = path.split(":")
+    if allow_import:
+        obj = importlib.import_module(module_name)
+    else:
+        try:
+            obj = sys.modules[module_name]
+        except KeyError:
+            raise SnapshotError(
+                f"Snapshot refers to a class in module {module_name!r}, which has not been imported "
+                f"(use `allow_import=True` to import it if the snapshot comes from a trusted source)."
+            )
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def make_snapshot(g):
+    """
+    Return a compact snapshot (a byte string) of the generator `g`, from which
+    `restore_snapshot()` can rebuild an equivalent generator in the same state.
+
+    Parameters
+    ----------
+    g : TohuBaseGenerator or ForeachGeneratorInstance
+        A primitive generator, a custom generator or a @foreach-wrapped custom generator.
+    """
+    from .custom_generator import CustomGenerator
+    from .foreach import ForeachGeneratorInstance
+    from .primitive_generators import PRIMITIVE_GENERATORS
+
+    if isinstance(g, ForeachGeneratorInstance):
+        schema = _make_custom_generator_schema(g.custom_gen_instance)
+        schema["foreach"] = True
+        state = g.custom_gen_instance.get_state()
+    elif isinstance(g, CustomGenerator):
+        schema = _make_custom_generator_schema(g)
+        state = g.get_state()
+    elif type(g) in PRIMITIVE_GENERATORS:
+        schema = {"kind": "primitive", "class": type(g).__name__, "kwargs": g._get_init_kwargs()}
+        state = g.get_state()
+    else:
+        raise SnapshotError(f"Cannot create snapshot of generator: {g}")
+
+    return encode_snapshot(schema, state)
+
+
+def _make_custom_generator_schema(g):
+    from .looping import LoopVariable
+
+    # Loop variables which still have the values from the class definition (e.g. those given
+    # to @foreach) get them again when the class is instantiated, so we only need to store the
+    # values of those which have been reassigned. This also means that their values don't need
+    # to be plain Python types (e.g. they can be dates).
+    cls = type(g)
+    loop_variables = {}
+    for x in g._tohu_namespace.loop_variables:
+        class_attr = getattr(cls, x.name, None)
+        if not (isinstance(class_attr, LoopVariable) and x._values is class_attr._values):
+            loop_variables[x.name] = x._values
+
+    return {
+        "kind": "custom",
+        "class": _get_import_path(cls),
+        "init_args": g._tohu_init_args,
+        "init_kwargs": g._tohu_init_kwargs,
+        "loop_variables": loop_variables,
+    }
+
+
+def restore_snapshot(data, *, allow_import=False):
+    """
+    Rebuild a generator from a snapshot created by `make_snapshot()`. The
+    resulting generator continues exactly where the original one was when
+    the snapshot was created.
+
+    Parameters
+    ----------
+    data : bytes
+        The snapshot.
+    allow_import : bool
+        If True, the module containing the class of a custom generator is imported if
+        necessary. This executes the module's code, so it should only be used for snapshots
+        from a trusted source. By default, the class is only looked up in modules which have
+        already been imported.
+    """
+    from .custom_generator import CustomGenerator
+    from .foreach import ForeachGeneratorClass, ForeachGeneratorInstance
+    from .primitive_generators import PRIMITIVE_GENERATORS
+
+    schema, state = decode_snapshot(data)
+
+    if schema["kind"] == "primitive":
+        primitive_generators_by_name = {cls.__name__: cls for cls in PRIMITIVE_GENERATORS}
+        try:
+            cls = primitive_generators_by_name[schema["class"]]
+        except KeyError:
+            raise SnapshotError(f"Invalid primitive generator class in snapshot: {schema['class']!r}")
+        return cls(**schema["kwargs"]).set_state(state)
+    elif schema["kind"] == "custom":
+        cls = _import_from_path(schema["class"], allow_import=allow_import)
+        if isinstance(cls, ForeachGeneratorClass):
+            cls = cls.custom_gen_cls
+        if not (isinstance(cls, type) and issubclass(cls, CustomGenerator)):
+            raise SnapshotError(f"Snapshot refers to an object which is not a custom generator: {schema['class']}")
+
+        g = cls(*schema["init_args"], **schema["init_kwargs"])
+        for name, values in schema["loop_variables"].items():
+            g.assign_loop_variable_values(name, values)
+        g.set_state(state)
+        return ForeachGeneratorInstance(g) if schema.get("foreach", False) else g
+    else:
+        raise SnapshotError(f"Invalid generator kind in snapshot: {schema['kind']!r}")
@@ -1,12 +1,85 @@
 import attr
+import datetime
 import re
 
-from typing import List
+from typing import Dict, List
 
 __all__ = ["make_tohu_items_class", "derive_tohu_items_class_name"]
 
 
-def make_tohu_items_class(clsname: str, field_names: List[str]):
+# Types of field values which `attr.astuple()` and `attr.asdict()` return unchanged. If all
+# field values of an item have one of these types there is no need to recurse into them.
+_SCALAR_TYPES = frozenset([type(None), bool, int, float, complex, str, bytes, datetime.date, datetime.datetime])
+
+
+def _make_method(name: str, source: str, globs: dict):
+    """
+    Compile the given source code (which must define a function called `name`) and return the function.
+    """
+    exec(compile(source, f"<tohu generated {name}>", "exec"), globs)
+    return globs[name]
+
+
+def _make_as_tuple_method(field_names: List[str]):
+    values = "".join(f"self.{name}, " for name in field_names)
+    source = (
+        "def as_tuple(self):\n"
+        f"    values = ({values})\n"
+        "    if _SCALAR_TYPES.issuperset(map(type, values)):\n"
+        "        return values\n"
+        "    return attr.astuple(self)\n"
+    )
+    return _make_method("as_tuple", source, {"attr": attr, "_SCALAR_TYPES": _SCALAR_TYPES})
+
+
+def _make_as_dict_method(field_names: List[str]):
+    items = "".join(f"{name!r}: self.{name}, " for name in field_names)
+    source = (
+        "def as_dict(self):\n"
+        f"    result = {{{items}}}\n"
+        "    if _SCALAR_TYPES.issuperset(map(type, result.values())):\n"
+        "        return result\n"
+        "    return attr.asdict(self)\n"
+    )
+    return _make_method("as_dict", source, {"attr": attr, "_SCALAR_TYPES": _SCALAR_TYPES})
+
+
+def _make_eq_method(field_names: List[str]):
+    """
+    Return a custom __eq__() method which also allows comparisons with
+    tuples and dictionaries. This is mostly for convenience during testing.
+    """
+    self_values = "".join(f"self.{name}, " for name in field_names)
+    other_values = "".join(f"other.{name}, " for name in field_names)
+    source = (
+        "def __eq__(self, other):\n"
+        "    if other.__class__ is self.__class__:\n"
+        f"        return ({self_values}) == ({other_values})\n"
+        "    return _eq_other(self, other)\n"
+    )
+    return _make_method("__eq__", source, {"_eq_other": _eq_other})
+
+
+def _eq_other(self, other):
+    """
+    Compare tohu item `self` with an object `other` which is not an instance of the same class.
+    """
+    if isinstance(other, self.__class__):
+        return NotImplemented
+    elif isinstance(other, tuple):
+        return self.as_tuple() == other
+    elif isinstance(other, dict):
+        return self.as_dict() == other
+    elif hasattr(other, "__attrs_attrs__") and self.__class__.__name__ == other.__class__.__name__:
+        return attr.asdict(self) == attr.asdict(other)
+    else:
+        raise TypeError(
+            "Tohu items have types that cannot be compared: "
+            f"{self.__class__.__name__}, {other.__class__.__name__}"
+        )
+
+
+def make_tohu_items_class(clsname: str, field_names: List[str], field_dtypes: Dict[str, type] = None):
     """
     Parameters
     ----------
@@ -15,36 +88,23 @@ def make_tohu_items_class(clsname: str, field_names: List[str]):
 
     field_names: list of str
         Names of the field attributes of the class to be created.
+
+    field_dtypes: dict, optional
+        Types of the field values (as declared by the generators producing
+        them). This is used when exporting items, e.g. to a dataframe. Any
+        fields which are missing are assumed to have type `object`.
+
+    The class is created with `__slots__` (so that its instances don't carry a `__dict__`),
+    and its methods `as_tuple()`, `as_dict()` and `__eq__()` are generated specifically
+    for the given field names.
     """
-    item_cls = attr.make_class(clsname, {name: attr.ib() for name in field_names}, repr=True, cmp=True, frozen=True)
-    func_eq_orig = item_cls.__eq__
-
-    def func_eq_new(self, other):
-        """
-        Custom __eq__() method which also allows comparisons with
-        tuples and dictionaries. This is mostly for convenience
-        during testing.
-        """
-
-        if isinstance(other, self.__class__):
-            return func_eq_orig(self, other)
-        else:
-            if isinstance(other, tuple):
-                return attr.astuple(self) == other
-            elif isinstance(other, dict):
-                return attr.asdict(self) == other
-            elif hasattr(other, "__attrs_attrs__") and self.__class__.__name__ == other.__class__.__name__:
-                return attr.asdict(self) == attr.asdict(other)
-            else:
-                raise TypeError(
-                    "Tohu items have types that cannot be compared: "
-                    f"{self.__class__.__name__}, {other.__class__.__name__}"
-                )
-
-    item_cls.__eq__ = func_eq_new
+    attributes = {name: attr.ib() for name in field_names}
+    item_cls = attr.make_class(clsname, attributes, repr=True, eq=True, frozen=True, slots=True)
+    item_cls.__eq__ = _make_eq_method(field_names)
     item_cls.field_names = field_names
-    item_cls.as_dict = lambda self: attr.asdict(self)
-    item_cls.as_tuple = lambda self: attr.astuple(self)
+    item_cls.field_dtypes = {name: (field_dtypes or {}).get(name, object) for name in field_names}
+    item_cls.as_dict = _make_as_dict_method(field_names)
+    item_cls.as_tuple = _make_as_tuple_method(field_names)
     item_cls.is_unset = False
     return item_cls
 
@@ -1,4 +1,9 @@
+import logging
+
+from itertools import chain
+
 from .base import SeedGenerator
+from .checkpoints import CheckpointError
 from .derived_generators import Apply
 from .logging import logger
 from .looping import LoopVariable, LoopRunner
@@ -24,6 +29,15 @@ class NonExistentTohuItemsClass:
 
 
 class TohuNamespace:
+    """
+    Collection of the generators of a custom generator.
+
+    Before generating items, the generators are compiled into an evaluation schedule (see
+    `compile()`) which evaluates each generator exactly once per item. In particular, the
+    elements produced by generators which are inputs of `Apply` generators are passed to
+    these directly, instead of being produced a second time by the clones held by them.
+    """
+
     def __init__(self, tohu_items_class_name):
         self.tohu_items_class_name = tohu_items_class_name
         self.tohu_items_class = NonExistentTohuItemsClass()
@@ -33,6 +47,8 @@ class TohuNamespace:
         self.field_generators = {}
         self.all_generators = {}
         self.loop_runner = LoopRunner()
+        self.schedule = None
+        self.num_ticks = 0  # number of times the schedule has advanced the generators
 
     def add_generator(self, name, gen):
         if gen in self.gen_mapping:
@@ -44,27 +60,183 @@ class TohuNamespace:
         else:
             self.field_generators[name] = gen_spawned
         self.all_generators[name] = gen_spawned
+        self.schedule = None
 
         if isinstance(gen_spawned, LoopVariable):
             self.loop_runner.add_loop_variable(gen_spawned.name, gen_spawned)
 
     def make_tohu_items_class(self):
         field_names = list(self.field_generators.keys())
-        self.tohu_items_class = make_tohu_items_class(self.tohu_items_class_name, field_names)
+        field_dtypes = {name: g.dtype for name, g in self.field_generators.items()}
+        self.tohu_items_class = make_tohu_items_class(self.tohu_items_class_name, field_names, field_dtypes)
+        self.compile()
+
+    def compile(self):
+        """
+        Compile the dependency graph of the generators in this namespace into a flat evaluation schedule.
+
+        The schedule contains all field generators plus any generators they depend on (hidden
+        generators which no field depends on are pruned), in topological order. Since the inputs
+        of each generator must exist in `gen_mapping` when it is added to the namespace, the
+        insertion order is already a valid topological order.
+
+        This also creates the function `_next_item()`, which evaluates the schedule once in
+        straight-line code and returns the resulting item (and `_next_values()`, which does
+        the same but returns a plain tuple of field values instead).
+        """
+        inputs = {g: [c.parent for c in self._get_input_clones(g)] for g in self.all_generators.values()}
+
+        required = set()
+        pending = list(self.field_generators.values())
+        while pending:
+            g = pending.pop()
+            if g not in required:
+                required.add(g)
+                pending.extend(inputs[g])
+
+        self.schedule = [g for g in self.all_generators.values() if g in required]
+        for g in self.schedule:
+            if isinstance(g, Apply):
+                g._namespace = self
+
+        self._next_item = self._make_next_item_function()
+        self._next_values = self._make_next_item_function(as_tuple=True)
+
+    @staticmethod
+    def _get_input_clones(g):
+        if isinstance(g, Apply):
+            return list(chain(g.arg_gens, g.kwarg_gens.values()))
+        return []
+
+    def _make_next_item_function(self, as_tuple=False):
+        idx = {g: i for i, g in enumerate(self.schedule)}
+        globs = {"tohu_items_class": self.tohu_items_class}
+        lines = []
+        for i, g in enumerate(self.schedule):
+            if isinstance(g, Apply):
+                globs[f"func_{i}"] = g.scalar_func
+                args = [f"v_{idx[c.parent]}" for c in g.arg_gens]
+                args += [f"{name}=v_{idx[c.parent]}" for name, c in g.kwarg_gens.items()]
+                lines.append(f"    v_{i} = func_{i}({', '.join(args)})")
+            else:
+                globs[f"next_{i}"] = g.__next__
+                lines.append(f"    v_{i} = next_{i}()")
+        field_values = "".join(f"v_{idx[g]}, " for g in self.field_generators.values())
+        if as_tuple:
+            lines.append(f"    return ({field_values})")
+        else:
+            lines.append(f"    return tohu_items_class({field_values})")
+
+        source = "def next_item():\n" + "\n".join(lines) + "\n"
+        exec(compile(source, f"<tohu namespace {self.tohu_items_class_name}>", "exec"), globs)
+        return globs["next_item"]
 
     def __next__(self):
-        gen_vals = (next(g) for g in self.field_generators.values())
-        return self.tohu_items_class(*gen_vals)
+        if self.schedule is None:
+            self.compile()
+        self.num_ticks += 1
+        return self._next_item()
+
+    def generate_list(self, num):
+        """
+        Return a list of the next `num` items (which is equivalent to calling `next()` on this namespace `num` times).
+        """
+        if self.schedule is None:
+            self.compile()
+        self.num_ticks += 1
+
+        next_item = self._next_item
+        return [next_item() for _ in range(num)]
+
+    def generate_value_tuples(self, num):
+        """
+        Return a list of the next `num` items as plain tuples of field values (in the order of the fields).
+
+        This is equivalent to `generate_list()` but avoids creating the item objects, which is useful
+        if the values are going to be converted to columns anyway.
+        """
+        if self.schedule is None:
+            self.compile()
+        self.num_ticks += 1
+
+        next_values = self._next_values
+        return [next_values() for _ in range(num)]
+
+    def generate_columns(self, num):
+        """
+        Return a dictionary mapping each field name to a numpy array with the next `num` values for this field.
+
+        The values are produced by evaluating the schedule column by column: each generator
+        produces all its elements at once (and `Apply` generators are applied to the columns
+        produced by their inputs), which gives exactly the same values as producing `num`
+        items via `next()`.
+        """
+        if self.schedule is None:
+            self.compile()
+        self.num_ticks += 1
+
+        columns = {}
+        for g in self.schedule:
+            if isinstance(g, Apply):
+                arg_columns = [columns[c.parent] for c in g.arg_gens]
+                kwarg_columns = {name: columns[c.parent] for name, c in g.kwarg_gens.items()}
+                columns[g] = g.apply_to_columns(num, arg_columns, kwarg_columns)
+            else:
+                columns[g] = g.generate_batch(num)
+
+        return {name: columns[g] for name, g in self.field_generators.items()}
+
+    def skip(self, num):
+        """
+        Advance all generators in the schedule by `num` elements (which is
+        equivalent to calling `next()` on this namespace `num` times).
+        """
+        if self.schedule is None:
+            self.compile()
+        self.num_ticks += 1
+
+        for g in self.schedule:
+            # `Apply` generators don't have any state of their own (their inputs are advanced separately).
+            if not isinstance(g, Apply):
+                g.skip(num)
 
     def reset(self, seed):
         self.seed_generator.reset(seed)
 
-        logger.debug(f"In TohuNamespace for items class '{self.tohu_items_class_name}':")
+        # Note: formatting the debug messages is relatively expensive (e.g. for loop variables with many
+        # values), and this method is called once per loop iteration in @foreach loops, so we avoid doing
+        # it unless the messages are actually emitted.
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"In TohuNamespace for items class '{self.tohu_items_class_name}':")
         for name, g in self.all_generators.items():
             next_seed = next(self.seed_generator)
-            logger.debug(f"  - Resetting {name}={g} with seed={next_seed}")
+            if debug:
+                logger.debug(f"  - Resetting {name}={g} with seed={next_seed}")
             g.reset(next_seed)
 
+    def get_state(self):
+        """
+        Return a dictionary mapping the name of each generator in this namespace to its state (see
+        `TohuBaseGenerator.get_state()`). Apply generators are omitted because their state is derived
+        from that of their inputs (which are part of the namespace, too).
+        """
+        return {name: g.get_state() for name, g in self.all_generators.items() if not isinstance(g, Apply)}
+
+    def set_state(self, state):
+        names = [name for name, g in self.all_generators.items() if not isinstance(g, Apply)]
+        if sorted(names) != sorted(state):
+            raise CheckpointError(
+                f"Generator names in state do not match those in the namespace of '{self.tohu_items_class_name}'. "
+                f"Expected: {names}. Got: {list(state)}"
+            )
+
+        for name in names:
+            self.all_generators[name].set_state(state[name])
+
+        # Make sure that Apply generators copy the restored state of their inputs before producing the next element.
+        self.num_ticks += 1
+
     @property
     def loop_variables(self):
         return [g for g in self.all_generators.values() if isinstance(g, LoopVariable)]
@@ -1,4 +1,6 @@
-__all__ = ["print_generated_sequence", "identity"]
+import numpy as np
+
+__all__ = ["print_generated_sequence", "identity", "make_object_array"]
 
 
 def print_generated_sequence(gen, num, *, seed=None, sep=", ", fmt="{}"):
@@ -25,3 +27,19 @@ def identity(x):
     That is, `identity(x)` returns `x` for any input `x`.
     """
     return x
+
+
+def make_object_array(values):
+    """
+    Helper function which returns a one-dimensional numpy array of dtype
+    `object` containing the elements of `values`.
+
+    In contrast to `np.array(values, dtype=object)` this also works as
+    expected if the elements are themselves sequences (e.g. tuples), in
+    which case numpy would otherwise create a multi-dimensional array.
+    """
+    values = list(values)
+    result = np.empty(len(values), dtype=object)
+    for idx, x in enumerate(values):
+        result[idx] = x
+    return result